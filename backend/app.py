@@ -1,26 +1,556 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
+import functools
+import gzip
+import hashlib
+import json
 import os
+import queue
+import threading
+import time
+import contextvars
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from dotenv import load_dotenv
-from utils import Requester, Formatter, ML_Tools
+import pandas as pd
+from utils import Requester, Formatter, ML_Tools, QuotaLimiter, ResultCache
+from store import ChannelDirectory, FeatureStore, VideoStore
+from scheduler import RefreshScheduler
+from metrics import REGISTRY, collect_timings, stage
+
+try:
+    import brotli
+except ImportError:  # optional: columnar responses fall back to gzip
+    brotli = None
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
+Requester.max_workers = int(os.getenv('REQUESTER_MAX_WORKERS', Requester.max_workers))
+# Optional client-side pacing of quota units. Off by default: YouTube's per-minute
+# limits are far above what one server spends, and the binding limit is the daily
+# quota, which pacing per second doesn't protect; a 50 units/s bucket alone would
+# hold a 4,000-unit (100k-video) fetch for ~80 s.
+_quota_rate = float(os.getenv('QUOTA_UNITS_PER_SECOND', '0'))
+Requester.limiter = QuotaLimiter(
+    rate=_quota_rate,
+    capacity=float(os.getenv('QUOTA_BURST', '100')),
+) if _quota_rate > 0 else None
+# Upstream response bodies kept for If-None-Match revalidation (0 disables)
+_etag_cache_size = int(os.getenv('ETAG_CACHE_SIZE', '1024'))
+Requester.etag_cache = ResultCache(
+    maxsize=_etag_cache_size,
+    ttl=float(os.getenv('ETAG_CACHE_TTL', '86400')),
+) if _etag_cache_size > 0 else None
+ML_Tools.result_cache = ResultCache(
+    maxsize=int(os.getenv('ML_CACHE_SIZE', '128')),
+    ttl=float(os.getenv('ML_CACHE_TTL', '600')),
+)
+# Background response-shape inference and schema drift checks against a saved baseline
+Requester.shape_debug = os.getenv('SHAPE_DEBUG', '').lower() in ('1', 'true', 'yes')
+Requester.shape_sample_size = int(os.getenv('SHAPE_SAMPLE_SIZE', '200')) or None
+Requester.shape_baseline = os.getenv('SHAPE_BASELINE') or None
+# Stored videos' statistics are re-pulled (1 quota unit per 50 videos) once older than this
+Requester.stats_ttl = float(os.getenv('STATS_TTL', os.getenv('STALE_AFTER', '300')))
+VIDEO_STORE_PATH = os.getenv('VIDEO_STORE_PATH', os.path.join(os.path.dirname(__file__), 'video_store.sqlite3'))
+Requester.video_store = VideoStore(VIDEO_STORE_PATH)
+# Persistent handle -> channelId -> uploads playlist mappings (shares the video store file by default)
+Requester.channel_directory = ChannelDirectory(
+    os.getenv('CHANNEL_DIRECTORY_PATH', VIDEO_STORE_PATH),
+    ttl=float(os.getenv('CHANNEL_DIRECTORY_TTL', str(30 * 86400))),
+)
+feature_store = FeatureStore(
+    os.getenv('FEATURE_STORE_DIR', os.path.join(os.path.dirname(__file__), 'feature_store'))
+)
+# Max channels per /api/channels/batch call and worker processes for its analysis
+BATCH_MAX_CHANNELS = int(os.getenv('BATCH_MAX_CHANNELS', '50'))
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', str(os.cpu_count() or 2)))
+_analysis_pool = None
+_pool_lock = threading.Lock()  # guards lazy creation and replacement of the process pools
+# k-fold evaluation: default/max folds, worker processes (1 = in-process) and Ridge/Lasso alpha grid
+EVAL_FOLDS = int(os.getenv('EVAL_FOLDS', '5'))
+EVAL_MAX_FOLDS = int(os.getenv('EVAL_MAX_FOLDS', '20'))
+EVAL_WORKERS = int(os.getenv('EVAL_WORKERS', str(ANALYSIS_WORKERS)))
+EVAL_ALPHAS = [float(a) for a in os.getenv('EVAL_ALPHAS', '').split(',') if a.strip()] or ML_Tools.EVAL_ALPHAS
+_evaluation_pool = None
+# Videos per `videos` event when streaming an already cached or stored channel
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', '500'))
+Requester.stream_batch_size = STREAM_BATCH_SIZE
+# Most ?rolling= windows per request and the largest window (videos)
+ROLLING_MAX_WINDOWS = int(os.getenv('ROLLING_MAX_WINDOWS', '10'))
+ROLLING_MAX_SIZE = int(os.getenv('ROLLING_MAX_SIZE', '500'))
+# Default and maximum points per /api/channel/<id>/series response
+SERIES_DEFAULT_POINTS = int(os.getenv('SERIES_DEFAULT_POINTS', '1000'))
+SERIES_MAX_POINTS = int(os.getenv('SERIES_MAX_POINTS', '10000'))
+
 app = Flask(__name__)
 
+def get_analysis_pool():
+    """Lazily start the process pool used for CPU-bound per-channel analysis."""
+    global _analysis_pool
+    with _pool_lock:
+        if _analysis_pool is None:
+            _analysis_pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, mp_context=ML_Tools.worker_context())
+        return _analysis_pool
+
+def discard_analysis_pool(pool):
+    """Drop a broken analysis pool (e.g. a worker was OOM-killed) so the next call starts a new one."""
+    global _analysis_pool
+    with _pool_lock:
+        if _analysis_pool is pool:
+            _analysis_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def get_evaluation_pool():
+    """Lazily start the process pool for k-fold evaluation, or None to run in-process."""
+    global _evaluation_pool
+    with _pool_lock:
+        if _evaluation_pool is None and EVAL_WORKERS > 1:
+            _evaluation_pool = ML_Tools.evaluation_pool(EVAL_WORKERS)
+        return _evaluation_pool
+
+def discard_evaluation_pool(pool):
+    """Drop a broken evaluation pool so the next call starts a new one."""
+    global _evaluation_pool
+    with _pool_lock:
+        if _evaluation_pool is pool:
+            _evaluation_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def fetch_channel(channel_id):
+    """Fetch one channel's videos as lean VideoColumns, returning (columns, quota spent).
+
+    The batch endpoint never returns raw items, so it skips holding them and
+    ships only typed arrays to the analysis processes.
+    """
+    with Requester.track_quota() as quota:
+        data = Requester.get_channel_video_columns(channel_id)
+    return data, quota.to_dict()
+
+def warm_channel(channel_id, data):
+    """Prepare features and the default model for freshly refreshed data."""
+    ML_Tools.cached_regression(channel_id, feature_store.features(channel_id, data))
+
+def data_fetched_at(channel_or_handle):
+    """When a channel's stored statistics were last fetched upstream, or None if not stored (= just now)."""
+    store = Requester.video_store
+    if store is None:
+        return None
+    return store.refreshed_at(Requester.resolve_channel_id(channel_or_handle))
+
+def data_age(fetched_at):
+    return max(0.0, time.time() - fetched_at) if fetched_at is not None else 0.0
+
+# Last good result per channel (least recently used evicted past SCHEDULER_MAX_CHANNELS);
+# WATCHLIST channels are refreshed in the background
+scheduler = RefreshScheduler(
+    Requester.get_channel_videos_request,
+    watchlist=[c.strip() for c in os.getenv('WATCHLIST', '').split(',') if c.strip()],
+    interval=float(os.getenv('REFRESH_INTERVAL', '900')),
+    stale_after=float(os.getenv('STALE_AFTER', '300')),
+    on_refresh=warm_channel,
+    prefetch=Requester.resolve_channels,
+    max_entries=int(os.getenv('SCHEDULER_MAX_CHANNELS', '128')),
+    fetched_at=data_fetched_at,
+    key=Requester.canonical_channel_id,  # same keys as load_channel
+)
+
+@app.before_request
+def start_scheduler():
+    # Started by the first request rather than at import, so it runs in every
+    # serving process (flask run, python app.py, gunicorn workers, --preload
+    # included) and never in the debug reloader's file-watching parent.
+    scheduler.start()
+
+REGISTRY.gauge(
+    'podlevel_etag_cache',
+    'Requester.etag_cache statistics (size, maxsize, ttl, hits, misses, evictions).',
+    lambda: Requester.etag_cache.stats() if Requester.etag_cache is not None else None,
+    labelname='stat',
+)
+REGISTRY.gauge(
+    'podlevel_model_cache',
+    'ML_Tools.result_cache statistics (size, maxsize, ttl, hits, misses, evictions).',
+    lambda: ML_Tools.result_cache.stats(),
+    labelname='stat',
+)
+
+def server_timing(view):
+    """Time a view as a stage and report its per-stage breakdown in a Server-Timing header."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with collect_timings() as timings:
+            with stage(view.__name__):
+                resp = app.make_response(view(*args, **kwargs))
+        resp.headers['Server-Timing'] = timings.header()
+        return resp
+    return wrapper
+
+def load_channel(channel_or_handle):
+    """Return (channel ID, videos, age seconds, quota ledger) for a channel ID or @handle.
+
+    Serves the last good result immediately and revalidates it in the
+    background if stale; only a cold channel is fetched inline. Handles are
+    resolved first, so everything downstream is keyed by channel ID.
+    """
+    with Requester.track_quota() as quota:
+        channel_id = Requester.canonical_channel_id(channel_or_handle)
+        data, age = scheduler.get(channel_id)
+        if data is None:
+            data = Requester.get_channel_videos_request(channel_id)
+            fetched_at = data_fetched_at(channel_id)
+            scheduler.put(channel_id, data, fetched_at)
+            age = data_age(fetched_at)
+        elif scheduler.is_stale(age):
+            scheduler.revalidate(channel_id)
+    return channel_id, data, age, quota
+
+def channel_features(channel_id, data, args):
+    """Feature frame for a channel's videos, with any ?rolling= window features."""
+    # Stored per-channel features; only videos new since last time go through Formatter
+    with stage('features'):
+        features = feature_store.features(channel_id, data)
+    # ?rolling=3,5,10 adds "last N videos" features for each window size
+    windows = parse_rolling_arg(args.get('rolling'))
+    if windows:
+        generation = features.attrs.get('generation')
+        features = features.join(Formatter.rolling_features(features, windows))
+        features.attrs['generation'] = generation
+    return features
+
+def model_channel(channel_id, data, args):
+    """Features and regression for a channel's videos, JSON-safe (no model)."""
+    features = channel_features(channel_id, data, args)
+    if args.get('model') == 'incremental':
+        # Fold only new videos into running statistics (full-data fit, in-sample metrics)
+        lr_result = ML_Tools.incremental_regression(
+            channel_id,
+            features,
+            [v.get('id') for v in data],
+            target_column='viewCount',
+            trend_time_column='daysSinceOrigination',
+            generation=features.attrs.get('generation'),
+        )
+    else:
+        lr_result = ML_Tools.cached_regression(
+            channel_id,
+            features,
+            target_column='viewCount',
+            trend_time_column='daysSinceOrigination',
+        )
+    # Return JSON-safe result (exclude non-serializable model)
+    return {k: v for k, v in lr_result.items() if k != 'model'}
+
+def parse_rolling_arg(value):
+    """Window sizes from ?rolling=3,5,10; ValueError past ROLLING_MAX_WINDOWS or ROLLING_MAX_SIZE."""
+    windows = sorted({int(w) for w in (value or '').split(',') if w.strip().isdigit() and int(w) > 0})
+    if len(windows) > ROLLING_MAX_WINDOWS or (windows and windows[-1] > ROLLING_MAX_SIZE):
+        raise ValueError(f'rolling takes at most {ROLLING_MAX_WINDOWS} windows of up to {ROLLING_MAX_SIZE} videos')
+    return windows
+
+def parse_time_arg(value):
+    """Epoch seconds from a query arg given as epoch seconds or an ISO-8601 date/time (UTC)."""
+    if value is None or value == '':
+        return None
+    if value.lstrip('-').isdigit():
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return int(ts.timestamp())
+
+def videos_etag(path, data, args):
+    """ETag fingerprinting a channel's videos, the path and query args.
+
+    Each video counts by its upstream etag plus its statistics: a stored
+    video's etag may predate the statistics refreshed into it, and counts
+    are what change. Weak, since data_age_seconds and quota in the body
+    change on every call even when the videos and data_ml do not.
+    """
+    h = hashlib.sha1(path.encode('utf-8'))
+    h.update(json.dumps(sorted(args.items(multi=True))).encode('utf-8'))
+    for video in data:
+        h.update(b'\x1f')
+        h.update((video.get('etag') or json.dumps(video, sort_keys=True)).encode('utf-8'))
+        h.update(json.dumps(video.get('statistics'), sort_keys=True).encode('utf-8'))
+    return h.hexdigest()
+
+def not_modified(etag):
+    """Bodiless 304 for a client already holding `etag`."""
+    resp = Response(status=304)
+    resp.set_etag(etag, weak=True)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+def compressed_json_response(payload):
+    """Serialize payload compactly and compress it per Accept-Encoding (br > gzip)."""
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli is not None else ['gzip'])
+    if encoding == 'br':
+        body = brotli.compress(body)
+    elif encoding == 'gzip':
+        body = gzip.compress(body, compresslevel=6)
+    resp = Response(body, mimetype='application/json')
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+    resp.headers['Vary'] = 'Accept-Encoding'
+    return resp
+
 @app.route('/api/channel/<channel_id>/videos')
+@server_timing
 def channel_videos(channel_id):
-    data = Requester.get_channel_videos_request(channel_id)
-    features = Formatter.videos_to_dataframe(data)
-    features_std = ML_Tools.standardize_features(features)
-    lr_result = ML_Tools.run_linear_regression(
-        features_std,
-        target_column='viewCount',
-        trend_df=features,
-        trend_time_column='daysSinceOrigination',
-    )
-    # Return JSON-safe result (exclude non-serializable model)
-    lr_json = {k: v for k, v in lr_result.items() if k != 'model'}
-    return jsonify(items=data, data_ml=lr_json)
+    # ?format=columnar returns one array per field instead of raw items
+    columnar = request.args.get('format') == 'columnar'
+    fields = [f for f in request.args.get('fields', '').split(',') if f] or None
+    if columnar and fields:
+        unknown = [f for f in fields if f not in Formatter.COLUMN_FIELDS]
+        if unknown:
+            return jsonify(error=f"Unknown field(s): {', '.join(unknown)}"), 400
+    try:
+        parse_rolling_arg(request.args.get('rolling'))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    channel_id, data, age, quota = load_channel(channel_id)
+    if not data:
+        return jsonify(error='No videos found'), 404
+    # Unchanged videos + same args: skip the model and serialization entirely
+    etag = videos_etag(request.path, data, request.args)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    lr_json = model_channel(channel_id, data, request.args)
+    if columnar:
+        columns = Formatter.videos_to_columns(data, fields)
+        with stage('serialize'):
+            resp = compressed_json_response({
+                'format': 'columnar',
+                'count': len(data),
+                'columns': columns,
+                'data_ml': lr_json,
+                'quota': quota.to_dict(),
+                'data_age_seconds': age,
+            })
+    else:
+        with stage('serialize'):
+            resp = jsonify(items=data, data_ml=lr_json, quota=quota.to_dict(), data_age_seconds=age)
+    resp.set_etag(etag, weak=True)
+    resp.headers['Cache-Control'] = 'no-cache'  # always revalidate; a match costs only a 304
+    return resp
+
+@app.route('/api/channel/<channel_id>/videos/stream')
+def channel_videos_stream(channel_id):
+    """Stream a channel's videos in batches as they arrive, then its data_ml.
+
+    NDJSON by default (one {"event": ..., ...} object per line); Server-Sent
+    Events with ?format=sse or Accept: text/event-stream. Events: `videos`
+    (items, running count) one or more times, then `data_ml` (with quota,
+    count and data_age_seconds) or `error`. Takes the same ?rolling= and
+    ?model= options as channel_videos.
+    """
+    sse = request.args.get('format') == 'sse' or request.accept_mimetypes.best == 'text/event-stream'
+    args = request.args.copy()
+    try:
+        parse_rolling_arg(args.get('rolling'))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    channel_id = Requester.canonical_channel_id(channel_id)
+
+    def encode(event, payload):
+        if sse:
+            return f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+        return json.dumps({'event': event, **payload}, separators=(',', ':')) + '\n'
+
+    def fetch(chunks):
+        # Own thread, so it finishes (and warms the cache) even if the client goes away.
+        # Puts each batch (a list), then a final (data, quota, fetched_at) tuple.
+        data, quota, fetched_at = [], None, None
+        try:
+            with Requester.track_quota() as quota:
+                data = Requester.stream_channel_videos(channel_id, chunks.put)
+            fetched_at = data_fetched_at(channel_id)
+            scheduler.put(channel_id, data, fetched_at)
+        finally:
+            chunks.put((data, quota, fetched_at))
+
+    def generate():
+        data, age = scheduler.get(channel_id)
+        if data is not None:
+            with Requester.track_quota() as quota:
+                if scheduler.is_stale(age):
+                    scheduler.revalidate(channel_id)
+            for i in range(0, len(data), STREAM_BATCH_SIZE):
+                yield encode('videos', {'items': data[i:i + STREAM_BATCH_SIZE], 'count': min(i + STREAM_BATCH_SIZE, len(data))})
+        else:
+            chunks = queue.Queue()
+            threading.Thread(target=contextvars.copy_context().run, args=(fetch, chunks), daemon=True).start()
+            count = 0
+            while isinstance(batch := chunks.get(), list):
+                count += len(batch)
+                yield encode('videos', {'items': batch, 'count': count})
+            data, quota, fetched_at = batch
+            age = data_age(fetched_at)
+
+        if not data:
+            yield encode('error', {'error': 'No videos found'})
+            return
+        try:
+            lr_json = model_channel(channel_id, data, args)
+        except ValueError as e:
+            yield encode('error', {'error': str(e)})
+            return
+        yield encode('data_ml', {
+            'data_ml': lr_json,
+            'count': len(data),
+            'quota': quota.to_dict() if quota is not None else None,
+            'data_age_seconds': age,
+        })
+
+    resp = Response(generate(), mimetype='text/event-stream' if sse else 'application/x-ndjson')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'  # don't let a proxy buffer the stream
+    return resp
+
+@app.route('/api/channel/<channel_id>/series')
+@server_timing
+def channel_series(channel_id):
+    """One metric over time, downsampled (LTTB) to ?points= for plotting.
+
+    ?metric=viewCount|likeCount|... (default viewCount), ?points=<pixel
+    budget> (default 1000), and optional ?start=/&end= (epoch seconds or
+    ISO-8601) to fetch only the visible range of a zoomed view.
+    """
+    metric = request.args.get('metric', 'viewCount')
+    if metric not in Formatter.SERIES_METRICS:
+        return jsonify(error=f"Unknown metric: {metric}"), 400
+    try:
+        points = int(request.args.get('points', SERIES_DEFAULT_POINTS))
+        start = parse_time_arg(request.args.get('start'))
+        end = parse_time_arg(request.args.get('end'))
+    except ValueError:
+        return jsonify(error='points must be an integer; start/end epoch seconds or ISO-8601'), 400
+    if not 3 <= points <= SERIES_MAX_POINTS:
+        return jsonify(error=f'points must be between 3 and {SERIES_MAX_POINTS}'), 400
+
+    channel_id, data, age, quota = load_channel(channel_id)
+    etag = videos_etag(request.path, data, request.args)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    series = Formatter.downsample_series(data, metric, points, start, end)
+    with stage('serialize'):
+        resp = compressed_json_response({**series, 'quota': quota.to_dict(), 'data_age_seconds': age})
+    resp.set_etag(etag, weak=True)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@app.route('/api/channel/<channel_id>/evaluate')
+@server_timing
+def channel_evaluate(channel_id):
+    """k-fold cross-validation of OLS, Ridge and Lasso on a channel's features.
+
+    ?folds= (default EVAL_FOLDS), ?target= (default viewCount) and ?rolling=
+    as for channel_videos. Candidates are scored in parallel on the
+    EVAL_WORKERS process pool and returned best first with mean/std metrics.
+    """
+    try:
+        folds = int(request.args.get('folds', EVAL_FOLDS))
+    except ValueError:
+        return jsonify(error='folds must be an integer'), 400
+    if not 2 <= folds <= EVAL_MAX_FOLDS:
+        return jsonify(error=f'folds must be between 2 and {EVAL_MAX_FOLDS}'), 400
+    target = request.args.get('target', 'viewCount')
+    try:
+        parse_rolling_arg(request.args.get('rolling'))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    channel_id, data, age, quota = load_channel(channel_id)
+    if not data:
+        return jsonify(error='No videos found'), 404
+    features = channel_features(channel_id, data, request.args)
+    for _ in range(2):
+        pool = get_evaluation_pool()
+        try:
+            evaluation = ML_Tools.evaluate_models(
+                features,
+                target_column=target,
+                folds=folds,
+                alphas=EVAL_ALPHAS,
+                executor=pool,
+            )
+            break
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); retry once on a fresh pool
+            discard_evaluation_pool(pool)
+    else:
+        return jsonify(error='Evaluation worker crashed'), 503
+    return jsonify(evaluation=evaluation, quota=quota.to_dict(), data_age_seconds=age)
+
+@app.route('/api/metrics')
+def metrics():
+    """Stage latencies, upstream requests/bytes/quota and cache stats, Prometheus text format."""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/channels/batch', methods=['GET', 'POST'])
+def channels_batch():
+    """Analyze several channels at once: ?channels=a,@b or JSON {"channels": [...]}.
+
+    Channels are fetched concurrently and each one's features + regression
+    are handed to the process pool as soon as its fetch completes.
+    """
+    body = request.get_json(silent=True) or {}
+    channels = body.get('channels') or [c for c in request.args.get('channels', '').split(',') if c]
+    target = body.get('target') or request.args.get('target', 'viewCount')
+    channels = list(dict.fromkeys(c.strip() for c in channels if isinstance(c, str) and c.strip()))
+    if not channels:
+        return jsonify(error='No channels given'), 400
+    if len(channels) > BATCH_MAX_CHANNELS:
+        return jsonify(error=f'At most {BATCH_MAX_CHANNELS} channels per batch'), 400
+
+    pool = get_analysis_pool()
+    results = {}
+    pending = {}
+    with ThreadPoolExecutor(max_workers=min(8, len(channels))) as fetchers:
+        fetches = {fetchers.submit(fetch_channel, c): c for c in channels}
+        for fut in as_completed(fetches):
+            channel = fetches[fut]
+            data, quota = fut.result()
+            if not data:
+                results[channel] = {'count': 0, 'error': 'No videos found', 'quota': quota}
+                continue
+            try:
+                analysis = pool.submit(ML_Tools.analyze_videos, data, target)
+            except BrokenProcessPool:
+                # A worker died under an earlier task; carry on with a fresh pool
+                discard_analysis_pool(pool)
+                pool = get_analysis_pool()
+                analysis = pool.submit(ML_Tools.analyze_videos, data, target)
+            pending[channel] = (analysis, pool, len(data), quota)
+
+    for channel, (fut, fut_pool, count, quota) in pending.items():
+        try:
+            results[channel] = {'count': count, 'data_ml': fut.result(), 'quota': quota}
+        except ValueError as e:
+            results[channel] = {'count': count, 'error': str(e), 'quota': quota}
+        except BrokenProcessPool:
+            discard_analysis_pool(fut_pool)
+            results[channel] = {'count': count, 'error': 'Analysis worker crashed', 'quota': quota}
+
+    # Side-by-side summary, best average target first
+    comparison = []
+    for channel in channels:
+        result = results[channel]
+        trend = (result.get('data_ml') or {}).get('trend') or {}
+        comparison.append({
+            'channel': channel,
+            'count': result['count'],
+            'avgTarget': trend.get('avgTarget'),
+            'trendSlope': trend.get('slope'),
+            'trendDirection': trend.get('direction'),
+            'pctChangePerTimeUnit': trend.get('pctChangePerTimeUnit'),
+            'r2': ((result.get('data_ml') or {}).get('metrics') or {}).get('r2'),
+        })
+    comparison.sort(key=lambda row: row['avgTarget'] if row['avgTarget'] is not None else float('-inf'), reverse=True)
+    return jsonify(target=target, channels=results, comparison=comparison)
 
 if __name__ == '__main__':
     Requester.store_key_from_env()
@@ -0,0 +1,669 @@
+"""Benchmarks for the backend pipeline, run against a local mock YouTube API.
+
+Usage:
+    python backend/bench.py details --videos 5000 --latency 0.05
+    python backend/bench.py pipeline --videos 5000 --latency 0.05
+    python backend/bench.py formatter --sizes 1000 10000 100000
+    python backend/bench.py evaluate --videos 5000 --workers 1 2 4
+    python backend/bench.py fields --videos 2000 [--fixture videos.json]
+    python backend/bench.py coalesce --parallel 16
+    python backend/bench.py directory --channels 200 --handles 5
+    python backend/bench.py e2e --sizes 100 1000 10000 100000 --out bench.json [--compare old.json]
+    python backend/bench.py e2e --sizes 1000 10000 --quota-rate 50 --quota-burst 100
+    python backend/bench.py memory --videos 50000
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import requests
+
+from mock_api import MockYouTubeAPI, apply_fields_mask, parse_fields_mask, synthetic_videos
+from utils import Formatter, ML_Tools, QuotaLimiter, Requester, VideoColumns
+from store import ChannelDirectory, VideoStore
+
+try:
+    import resource
+except ImportError:  # Windows: memory bench falls back to tracemalloc
+    resource = None
+
+
+class _NoKeepAlive:
+    """Session stand-in that opens a fresh connection per request (pre-pooling behaviour)."""
+
+    def get(self, url, **kwargs):
+        return requests.get(url, **kwargs)
+
+
+def _use_mock(api: MockYouTubeAPI):
+    Requester.API_BASE = api.base_url
+    Requester.api_key = 'bench'
+    Requester.video_store = None
+    Requester.etag_cache = None  # measure full transfers, not 304 revalidations
+    Requester.limiter = None  # the mock has no quota
+
+
+def _import_app(scratch):
+    """Import the Flask app with its stores pointed at a scratch directory."""
+    os.environ['VIDEO_STORE_PATH'] = os.path.join(scratch, 'videos.sqlite3')
+    os.environ['FEATURE_STORE_DIR'] = os.path.join(scratch, 'features')
+    import app as backend_app
+    return backend_app
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_details(args):
+    """Time get_video_details serially without keep-alive vs pooled and concurrent."""
+    videos = synthetic_videos(args.videos)
+    video_ids = [v['id'] for v in videos]
+    with MockYouTubeAPI(latency=args.latency) as api:
+        api.add_channel('UCbench', videos)
+        _use_mock(api)
+        modes = [
+            ('serial, no keep-alive', _NoKeepAlive(), 1),
+            ('serial, pooled session', None, 1),
+            (f'concurrent x{args.workers}, pooled session', None, args.workers),
+        ]
+        results = []
+        for label, session, workers in modes:
+            Requester.session = session
+            started = time.perf_counter()
+            items = Requester.get_video_details(video_ids, max_workers=workers)
+            elapsed = time.perf_counter() - started
+            assert [v['id'] for v in items] == video_ids, 'output order changed'
+            results.append((label, elapsed))
+        Requester.session = None
+
+    baseline = results[0][1]
+    print(f"get_video_details: {args.videos} videos, {(len(video_ids) + 49) // 50} chunks, "
+          f"{args.latency * 1000:.0f} ms latency")
+    for label, elapsed in results:
+        print(f"  {label:<36} {elapsed:8.3f}s  x{baseline / elapsed:.1f}")
+
+
+def bench_pipeline(args):
+    """Time paginate-then-fetch against the pipelined get_playlist_videos."""
+    videos = synthetic_videos(args.videos)
+    with MockYouTubeAPI(latency=args.latency) as api:
+        api.add_channel('UCbench', videos)
+        _use_mock(api)
+        playlist_id = 'UUbench'
+
+        started = time.perf_counter()
+        video_ids = Requester.get_all_video_ids(playlist_id)
+        paginate = time.perf_counter() - started
+        items = Requester.get_video_details(video_ids, max_workers=args.workers)
+        sequential = time.perf_counter() - started
+        details = sequential - paginate
+
+        started = time.perf_counter()
+        piped = Requester.get_playlist_videos(playlist_id, max_workers=args.workers)
+        pipelined = time.perf_counter() - started
+        assert [v['id'] for v in piped] == [v['id'] for v in items], 'output order changed'
+
+    print(f"{args.videos} videos, {args.latency * 1000:.0f} ms latency, {args.workers} workers")
+    print(f"  pagination stage      {paginate:8.3f}s")
+    print(f"  detail stage          {details:8.3f}s")
+    print(f"  sequential (sum)      {sequential:8.3f}s")
+    print(f"  pipelined             {pipelined:8.3f}s  x{sequential / pipelined:.2f}")
+
+
+def rowwise_videos_to_dataframe(videos_json):
+    """Reference row-at-a-time Formatter.videos_to_dataframe: the pre-vectorization
+    code, with the later daysSinceOrigination/daysSinceLastVideo NaT fix applied
+    (FEATURE_SCHEMA_VERSION 2).
+
+    Kept to benchmark against and to check the vectorized output is identical.
+    Before the fix, both columns were fractional days from timedelta64[s],
+    passed through pd.to_numeric and rounded to the nearest day. That turned
+    the oldest video's NaT diff into the int64 NaT sentinel (-9.2e18)
+    instead of 0. The fix uses whole (floored) days with NaT -> 0. This
+    reference follows the fix, so it is not the baseline's exact output.
+    """
+    def parse_duration(s):
+        if not isinstance(s, str) or not s:
+            return 0
+        m = re.fullmatch(r"P(?:(\d+)D)?T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", s)
+        if not m:
+            return 0
+        days, hours, minutes, seconds = (int(g or 0) for g in m.groups())
+        return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+    def to_bool(x):
+        if isinstance(x, bool):
+            return x
+        if isinstance(x, str):
+            x = x.strip().lower()
+            if x in ('true', '1', 'yes'):
+                return True
+            if x in ('false', '0', 'no'):
+                return False
+        return None
+
+    rows = []
+    for video in videos_json:
+        snippet = video.get('snippet', {})
+        statistics = video.get('statistics', {})
+        content_details = video.get('contentDetails', {})
+        rows.append({
+            'publishedAt': snippet.get('publishedAt'),
+            'viewCount': int(statistics.get('viewCount', 0) or 0),
+            'likeCount': int(statistics.get('likeCount', 0) or 0),
+            'commentCount': int(statistics.get('commentCount', 0) or 0),
+            'duration': content_details.get('duration'),
+            'categoryId': snippet.get('categoryId'),
+            'hasCaptionsRaw': content_details.get('caption'),
+            'numTags': len(snippet.get('tags') or []),
+            'titleLength': len(snippet.get('title') or ''),
+            'descriptionLength': len(snippet.get('description') or ''),
+        })
+    df = pd.DataFrame(rows)
+    df['publishedAt_dt'] = pd.to_datetime(df['publishedAt'], utc=True, errors='coerce')
+    df['publishedTimestamp'] = (
+        df['publishedAt_dt'].apply(lambda x: int(x.timestamp()) if pd.notnull(x) else pd.NA)
+    ).astype('Int64')
+    min_dt = df['publishedAt_dt'].min(skipna=True)
+    # Post-fix day arithmetic (whole days, NaT -> 0); see the docstring
+    df['daysSinceOrigination'] = (
+        df['publishedAt_dt'].apply(lambda x: (x - min_dt).days if pd.notnull(x) else 0).astype('Int64')
+    )
+    df_sorted = df.sort_values('publishedAt_dt')
+    df.loc[df_sorted.index, 'daysSinceLastVideo'] = (
+        df_sorted['publishedAt_dt'].diff().apply(lambda x: x.days if pd.notnull(x) else 0).astype('Int64')
+    )
+    df['hourOfDay'] = df['publishedAt_dt'].apply(lambda x: x.hour if pd.notnull(x) else pd.NA).astype('Int64')
+    df['dayOfWeek'] = df['publishedAt_dt'].apply(lambda x: x.dayofweek if pd.notnull(x) else pd.NA).astype('Int64')
+    df['durationSeconds'] = df['duration'].apply(parse_duration).astype('Int64')
+    df['hasCaptions'] = df['hasCaptionsRaw'].apply(to_bool).map({True: 1, False: 0}).fillna(0).astype('Int64')
+    df['categoryId'] = df['categoryId'].astype(str)
+    df = pd.concat([df, pd.get_dummies(df['categoryId'], prefix='cat', dtype='Int64')], axis=1)
+    dow_dummies = pd.get_dummies(df['dayOfWeek'], prefix='dow', dtype='Int64')
+    for d in range(7):
+        if f'dow_{d}' not in dow_dummies.columns:
+            dow_dummies[f'dow_{d}'] = 0
+    df = pd.concat([df, dow_dummies[[f'dow_{d}' for d in range(7)]]], axis=1)
+    feature_cols = [
+        'viewCount', 'likeCount', 'commentCount', 'durationSeconds',
+        'numTags', 'titleLength', 'descriptionLength',
+        'publishedTimestamp', 'daysSinceOrigination', 'daysSinceLastVideo',
+        'hourOfDay', 'hasCaptions'
+    ]
+    feature_cols += [c for c in df.columns if c.startswith('cat_')]
+    feature_cols += [c for c in df.columns if c.startswith('dow_')]
+    return df[feature_cols].apply(pd.to_numeric, errors='coerce').fillna(0.0).astype('float64')
+
+
+def bench_formatter(args):
+    """Time Formatter.videos_to_dataframe against the (post-NaT-fix) row-wise reference."""
+    print(f"{'videos':>8} {'row-wise':>10} {'vectorized':>11} {'speedup':>8}")
+    for n in args.sizes:
+        videos = synthetic_videos(n)
+        started = time.perf_counter()
+        expected = rowwise_videos_to_dataframe(videos)
+        rowwise = time.perf_counter() - started
+        started = time.perf_counter()
+        actual = Formatter.videos_to_dataframe(videos)
+        vectorized = time.perf_counter() - started
+        pd.testing.assert_frame_equal(actual, expected)
+        print(f"{n:>8} {rowwise:>9.3f}s {vectorized:>10.3f}s {rowwise / vectorized:>7.1f}x")
+
+
+def bench_evaluate(args):
+    """Time ML_Tools.evaluate_models over a range of worker counts and check
+    every run scores the candidates identically.
+    """
+    features = Formatter.videos_to_dataframe(synthetic_videos(args.videos))
+    print(f"{args.videos} videos, {features.shape[1] - 1} features, {args.folds} folds, "
+          f"{1 + 2 * len(ML_Tools.EVAL_ALPHAS)} candidates, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'time':>9} {'speedup':>8}")
+    baseline = expected = None
+    for workers in args.workers:
+        runs = []
+        for _ in range(args.repeat):
+            if workers > 1:
+                # Pool start-up is a one-off cost for the app's long-lived pool, so leave it out
+                with ML_Tools.evaluation_pool(workers) as pool:
+                    list(pool.map(abs, range(workers)))
+                    started = time.perf_counter()
+                    result = ML_Tools.evaluate_models(features, folds=args.folds, executor=pool)
+                    runs.append(time.perf_counter() - started)
+            else:
+                started = time.perf_counter()
+                result = ML_Tools.evaluate_models(features, folds=args.folds)
+                runs.append(time.perf_counter() - started)
+        elapsed = statistics.median(runs)
+        baseline = baseline or elapsed
+        expected = expected or result
+        assert result == expected, f'{workers} workers scored differently'
+        print(f"{workers:>8} {elapsed:>8.3f}s {baseline / elapsed:>7.2f}x")
+    best = expected['best']
+    print(f"  best: {best['estimator']} alpha={best['alpha']} rmse={best['metrics']['rmse']['mean']:.4f}"
+          f" ± {best['metrics']['rmse']['std']:.4f}")
+
+
+def bench_fields(args):
+    """Compare upstream bytes and JSON decode time with and without field masks."""
+    if args.fixture:
+        # Recorded `videos.list` items (a JSON list) from a real channel
+        with open(args.fixture, encoding='utf-8') as f:
+            videos = json.load(f)
+    else:
+        videos = synthetic_videos(args.videos)
+
+    with MockYouTubeAPI() as api:
+        api.add_channel('UCbench', videos)
+        _use_mock(api)
+        ledgers = {}
+        for masked in (False, True):
+            Requester.use_field_masks = masked
+            with Requester.track_quota() as ledger:
+                items = Requester.get_channel_videos_request('UCbench')
+            assert len(items) == len(videos)
+            ledgers[masked] = ledger
+        Requester.use_field_masks = True
+
+    print(f"{len(videos)} videos, upstream bytes per endpoint")
+    for endpoint in ('channels', 'playlistItems', 'videos'):
+        full = ledgers[False].bytes.get(endpoint, 0)
+        masked = ledgers[True].bytes.get(endpoint, 0)
+        print(f"  {endpoint:<14} {full:>12,} -> {masked:>12,}  ({100 * (1 - masked / full):.0f}% less)")
+
+    # JSON decode cost of the videos.list bodies, full vs masked
+    mask = parse_fields_mask(Requester.FIELD_MASKS['videos'])
+    chunks = [{'items': videos[i:i + 50]} for i in range(0, len(videos), 50)]
+    bodies = {
+        False: [json.dumps(c) for c in chunks],
+        True: [json.dumps(apply_fields_mask(c, mask)) for c in chunks],
+    }
+    decode = {}
+    for masked, texts in bodies.items():
+        started = time.perf_counter()
+        for text in texts:
+            json.loads(text)
+        decode[masked] = time.perf_counter() - started
+    print(f"  videos decode  {decode[False]:>11.4f}s -> {decode[True]:>11.4f}s  x{decode[False] / decode[True]:.1f}")
+
+
+def bench_coalesce(args):
+    """Fire N parallel lookups of one cold channel through the Flask app and
+    check they share a single upstream fetch and a single model fit.
+    """
+    scratch = tempfile.mkdtemp(prefix='podlevel-bench-')
+    backend_app = _import_app(scratch)
+
+    fits = []
+    run_linear_regression = ML_Tools.run_linear_regression
+    scheduler_put = backend_app.scheduler.put
+    ML_Tools.run_linear_regression = lambda *a, **kw: fits.append(1) or run_linear_regression(*a, **kw)
+    backend_app.scheduler.put = lambda channel_id, data, fetched_at=None: None  # keep every lookup cold
+
+    videos = synthetic_videos(args.videos)
+    try:
+        with MockYouTubeAPI(latency=args.latency) as api:
+            api.add_channel('UCbench', videos, handle='@bench')
+            _use_mock(api)
+            ML_Tools.result_cache.clear()
+
+            barrier = threading.Barrier(args.parallel)
+            statuses = []
+
+            def lookup():
+                client = backend_app.app.test_client()
+                barrier.wait()
+                statuses.append(client.get('/api/channel/@bench/videos').status_code)
+
+            started = time.perf_counter()
+            threads = [threading.Thread(target=lookup) for _ in range(args.parallel)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+            counts = dict(api.counts)
+    finally:
+        ML_Tools.run_linear_regression = run_linear_regression
+        backend_app.scheduler.put = scheduler_put
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    pages = (len(videos) + 49) // 50
+    print(f"{args.parallel} parallel lookups in {elapsed:.3f}s, statuses {sorted(set(statuses))}")
+    print(f"  upstream requests: {counts} (one fetch = 1 channels, {pages} playlistItems, {pages} videos)")
+    print(f"  model fits: {len(fits)}")
+    assert statuses == [200] * args.parallel, 'lookup failed'
+    assert counts == {'channels': 1, 'playlistItems': pages, 'videos': pages}, 'fetch was not coalesced'
+    assert len(fits) == 1, 'model fit was not coalesced'
+    print("  OK: exactly one upstream fetch and one model fit")
+
+
+def bench_directory(args):
+    """Resolve a watchlist cold and then warm through the ChannelDirectory and
+    count the `channels` calls each pass costs.
+    """
+    scratch = tempfile.mkdtemp(prefix='podlevel-bench-')
+    channel_ids = [f"UCdir{i:05d}" for i in range(args.channels)]
+    handles = [f"@dir{i}" for i in range(args.handles)]
+    with MockYouTubeAPI(latency=args.latency) as api:
+        for i, channel_id in enumerate(channel_ids):
+            api.add_channel(channel_id, [], handle=handles[i] if i < len(handles) else None)
+        _use_mock(api)
+        Requester.channel_directory = ChannelDirectory(os.path.join(scratch, 'directory.sqlite3'))
+        watchlist = channel_ids[len(handles):] + handles
+        passes = []
+        for label in ('cold', 'warm'):
+            before = api.counts.get('channels', 0)
+            started = time.perf_counter()
+            resolved = Requester.resolve_channels(watchlist)
+            passes.append((label, api.counts.get('channels', 0) - before, time.perf_counter() - started))
+    Requester.channel_directory = None
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    ids = len(channel_ids) - len(handles)
+    expected = len(handles) + (ids + 49) // 50
+    print(f"watchlist of {ids} channel IDs + {len(handles)} handles")
+    for label, calls, elapsed in passes:
+        print(f"  {label}: {calls} channels calls in {elapsed:.3f}s")
+    assert all(uploads for _, uploads in resolved.values()), 'unresolved channel'
+    assert passes[0][1] == expected, f'expected {expected} cold channels calls'
+    assert passes[1][1] == 0, 'warm pass hit the API'
+    print("  OK: IDs batched 50 per call, repeat lookups served from the directory")
+
+
+E2E_STAGES = (
+    'pagination', 'details', 'videos_to_dataframe',
+    'standardize_features', 'run_linear_regression', 'serialize',
+)
+
+
+def _e2e_run(backend_app, channel_id, playlist_id, workers):
+    """One pass of the channel_videos pipeline, stage by stage."""
+    timings = {}
+    with Requester.track_quota() as ledger:
+        started = time.perf_counter()
+        video_ids = Requester.get_all_video_ids(playlist_id)
+        timings['pagination'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        data = Requester.get_video_details(video_ids, max_workers=workers)
+        timings['details'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    features = Formatter.videos_to_dataframe(data)
+    timings['videos_to_dataframe'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    features_std = ML_Tools.standardize_features(features)
+    timings['standardize_features'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    lr_result = ML_Tools.run_linear_regression(
+        features_std,
+        target_column='viewCount',
+        trend_df=features,
+        trend_time_column='daysSinceOrigination',
+    )
+    timings['run_linear_regression'] = time.perf_counter() - started
+
+    # Same response construction as channel_videos
+    lr_json = {k: v for k, v in lr_result.items() if k != 'model'}
+    with backend_app.app.test_request_context(f'/api/channel/{channel_id}/videos'):
+        started = time.perf_counter()
+        body = backend_app.jsonify(
+            items=data, data_ml=lr_json, quota=ledger.to_dict(), data_age_seconds=0.0,
+        ).get_data()
+        timings['serialize'] = time.perf_counter() - started
+
+    assert len(data) == len(video_ids), 'videos missing from detail fetch'
+    return timings, ledger, len(body)
+
+
+def bench_e2e(args):
+    """Time every stage of channel_videos for synthetic channels of several sizes
+    and write the results as JSON for comparison between commits.
+    """
+    scratch = tempfile.mkdtemp(prefix='podlevel-bench-')
+    backend_app = _import_app(scratch)
+    # Injected errors are retried; keep the backoff short so it doesn't dominate
+    Requester.backoff_base, Requester.backoff_max = args.backoff, args.backoff * 8
+
+    results = []
+    try:
+        for n in args.sizes:
+            channel_id = f"UCe2e{n}"
+            videos = synthetic_videos(n, channel_id=channel_id)
+            with MockYouTubeAPI(latency=args.latency, error_rate=args.error_rate, seed=n) as api:
+                api.add_channel(channel_id, videos)
+                _use_mock(api)
+                if args.quota_rate:
+                    # Same client-side pacing as QUOTA_UNITS_PER_SECOND / QUOTA_BURST in the app
+                    Requester.limiter = QuotaLimiter(rate=args.quota_rate, capacity=args.quota_burst)
+                runs = [_e2e_run(backend_app, channel_id, 'UU' + channel_id[2:], args.workers)
+                        for _ in range(args.repeat)]
+                errors = api.errors
+            stages = {s: statistics.median(r[0][s] for r in runs) for s in E2E_STAGES}
+            ledger = runs[-1][1]
+            results.append({
+                'videos': n,
+                'stages': stages,
+                'total': sum(stages.values()),
+                'upstream_requests': dict(ledger.requests),
+                'upstream_bytes': sum(ledger.bytes.values()),
+                'retries': ledger.retries,
+                'injected_errors': errors,
+                'response_bytes': runs[-1][2],
+            })
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        'commit': _git_commit(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {
+            'latency': args.latency,
+            'error_rate': args.error_rate,
+            'workers': args.workers,
+            'repeat': args.repeat,
+            'quota_rate': args.quota_rate,
+            'quota_burst': args.quota_burst,
+        },
+        'results': results,
+    }
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = {r['videos']: r for r in json.load(f)['results']}
+
+    limiter = f"quota limiter {args.quota_rate:g}/s (burst {args.quota_burst:g})" if args.quota_rate else "no quota limiter"
+    print(f"{args.latency * 1000:.0f} ms latency, {args.error_rate:.0%} errors, "
+          f"{args.workers} workers, {limiter}, median of {args.repeat}")
+    print(f"{'videos':>8} " + ' '.join(f"{s[:12]:>12}" for s in E2E_STAGES) + f" {'total':>10}")
+    for r in results:
+        print(f"{r['videos']:>8} " + ' '.join(f"{r['stages'][s]:>11.3f}s" for s in E2E_STAGES)
+              + f" {r['total']:>9.3f}s")
+        old = baseline.get(r['videos'])
+        if old:
+            ratios = [r['stages'][s] / old['stages'][s] if old['stages'].get(s) else float('nan')
+                      for s in E2E_STAGES]
+            print(f"{'vs base':>8} " + ' '.join(f"{x:>11.2f}x" for x in ratios)
+                  + f" {r['total'] / old['total']:>9.2f}x")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.out}")
+
+
+def _peak_memory_kb() -> int:
+    """Peak RSS of this process so far (KB), or the tracemalloc peak without `resource`."""
+    try:
+        # Linux: VmHWM starts fresh at exec, unlike ru_maxrss which keeps the
+        # (larger) parent's high-water mark from before the fork
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        import tracemalloc
+        return tracemalloc.get_traced_memory()[1] // 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS
+
+
+def bench_memory_child(args):
+    """Fetch and featurize one channel in this (fresh) process and report peak memory."""
+    if resource is None:
+        import tracemalloc
+        tracemalloc.start()
+    Requester.API_BASE = args.base_url
+    Requester.api_key = 'bench'
+    Requester.video_store = VideoStore(args.store) if args.store else None
+    Requester.stats_ttl = float('inf')  # a warm store run reads stored videos back instead of re-pulling
+    Requester.etag_cache = None  # measure full transfers, not 304 revalidations
+    baseline = _peak_memory_kb()
+    if args.mode == 'raw':
+        data = Requester.get_channel_videos_request(args.channel)
+        features = Formatter.videos_to_dataframe(data)
+    else:
+        columns = Requester.get_channel_video_columns(args.channel)
+        features = columns.to_dataframe()
+    print(json.dumps({'rows': len(features), 'baseline_kb': baseline, 'peak_kb': _peak_memory_kb()}))
+
+
+def bench_memory(args):
+    """Peak memory of fetch + videos_to_dataframe, raw items vs lean VideoColumns,
+    without a video store and with one (a cold run that writes every video,
+    then a warm run that reads them back).
+
+    Each run is its own subprocess so peak RSS is not shared; the mock API
+    stays in this process and isn't counted.
+    """
+    videos = synthetic_videos(args.videos, channel_id='UCbench')
+    # The lean path must produce the same features
+    columns = VideoColumns()
+    for i in range(0, len(videos), 50):
+        columns.append(videos[i:i + 50])
+    pd.testing.assert_frame_equal(columns.to_dataframe(), Formatter.videos_to_dataframe(videos))
+    del columns
+
+    scratch = tempfile.mkdtemp(prefix='podlevel-bench-')
+    results = {}
+    try:
+        with MockYouTubeAPI() as api:
+            api.add_channel('UCbench', videos)
+            for store in ('none', 'cold', 'warm'):
+                for mode in ('raw', 'lean'):
+                    command = [sys.executable, os.path.abspath(__file__), 'memory-child',
+                               '--mode', mode, '--base-url', api.base_url, '--channel', 'UCbench']
+                    if store != 'none':
+                        command += ['--store', os.path.join(scratch, f'{mode}.sqlite3')]
+                    out = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+                    results[store, mode] = json.loads(out.strip().splitlines()[-1])
+                    assert results[store, mode]['rows'] == len(videos)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    measure = 'peak RSS' if resource is not None else 'tracemalloc peak'
+    print(f"{args.videos} videos, {measure} above post-import baseline (MB)")
+    print(f"  {'store':<6} {'raw':>9} {'lean':>9}")
+    for store in ('none', 'cold', 'warm'):
+        raw, lean = (results[store, mode]['peak_kb'] - results[store, mode]['baseline_kb'] for mode in ('raw', 'lean'))
+        print(f"  {store:<6} {raw / 1024:>9.1f} {lean / 1024:>9.1f}  lean uses {100 * (1 - lean / raw):.0f}% less")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('details', help='pooled/concurrent videos.list chunk fetching')
+    p.add_argument('--videos', type=int, default=5000)
+    p.add_argument('--latency', type=float, default=0.05, help='mock API latency per request (s)')
+    p.add_argument('--workers', type=int, default=Requester.max_workers)
+    p.set_defaults(func=bench_details)
+
+    p = sub.add_parser('pipeline', help='overlapped pagination and detail fetching')
+    p.add_argument('--videos', type=int, default=5000)
+    p.add_argument('--latency', type=float, default=0.05, help='mock API latency per request (s)')
+    p.add_argument('--workers', type=int, default=Requester.max_workers)
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser('formatter', help='vectorized Formatter.videos_to_dataframe')
+    p.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    p.set_defaults(func=bench_formatter)
+
+    p = sub.add_parser('evaluate', help='parallel k-fold model evaluation over a shared matrix')
+    p.add_argument('--videos', type=int, default=5000)
+    p.add_argument('--folds', type=int, default=5)
+    p.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    p.add_argument('--repeat', type=int, default=3, help='runs per worker count; the median is reported')
+    p.set_defaults(func=bench_evaluate)
+
+    p = sub.add_parser('fields', help='partial-response field masks: bytes and decode time')
+    p.add_argument('--videos', type=int, default=2000)
+    p.add_argument('--fixture', help='JSON list of recorded videos.list items to serve instead')
+    p.set_defaults(func=bench_fields)
+
+    p = sub.add_parser('coalesce', help='single-flight: N parallel lookups, one upstream fetch')
+    p.add_argument('--parallel', type=int, default=16)
+    p.add_argument('--videos', type=int, default=500)
+    p.add_argument('--latency', type=float, default=0.05, help='mock API latency per request (s)')
+    p.set_defaults(func=bench_coalesce)
+
+    p = sub.add_parser('directory', help='batched channel resolution through the ChannelDirectory')
+    p.add_argument('--channels', type=int, default=200)
+    p.add_argument('--handles', type=int, default=5)
+    p.add_argument('--latency', type=float, default=0.05, help='mock API latency per request (s)')
+    p.set_defaults(func=bench_directory)
+
+    p = sub.add_parser('e2e', help='per-stage timings of channel_videos, written as JSON')
+    p.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    p.add_argument('--latency', type=float, default=0.01, help='mock API latency per request (s)')
+    p.add_argument('--error-rate', type=float, default=0.0, help='fraction of mock requests failing with 503')
+    p.add_argument('--backoff', type=float, default=0.05, help='retry backoff base (s)')
+    p.add_argument('--workers', type=int, default=Requester.max_workers)
+    p.add_argument('--repeat', type=int, default=1, help='runs per size; the median is reported')
+    p.add_argument('--out', help='write results to this JSON file')
+    p.add_argument('--compare', help='earlier --out file to print per-stage ratios against')
+    p.add_argument('--quota-rate', type=float, default=0.0, help='quota units/s client-side limiter (0 = off)')
+    p.add_argument('--quota-burst', type=float, default=100.0, help='limiter bucket capacity (units)')
+    p.set_defaults(func=bench_e2e)
+
+    p = sub.add_parser('memory', help='peak memory: raw items vs lean VideoColumns ingestion')
+    p.add_argument('--videos', type=int, default=50000)
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser('memory-child', help='(internal) one measured run for `memory`')
+    p.add_argument('--mode', choices=('raw', 'lean'), required=True)
+    p.add_argument('--base-url', required=True)
+    p.add_argument('--channel', required=True)
+    p.add_argument('--store', help='VideoStore path (default: no store)')
+    p.set_defaults(func=bench_memory_child)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
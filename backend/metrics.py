@@ -0,0 +1,241 @@
+import bisect
+import contextvars
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, one series per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values (seconds by default)."""
+
+    kind = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for key, counts in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts[:-1]):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, [le])} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(counts[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    """Named metrics rendered together in the Prometheus text format.
+
+    Gauges are registered as callbacks returning either a number or a
+    {label value: number} dict, and are read at render time.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames=(), **kwargs) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, **kwargs)
+
+    def gauge(self, name: str, help: str, fn, labelname: str | None = None):
+        with self._lock:
+            self._gauges[name] = (help, fn, labelname)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            gauges = list(self._gauges.items())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for name, (help, fn, labelname) in gauges:
+            value = fn()
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            if isinstance(value, dict):
+                for label, v in sorted(value.items()):
+                    lines.append(f"{name}{_labels((labelname,), (label,))} {_number(v)}")
+            else:
+                lines.append(f"{name} {_number(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'podlevel_stage_duration_seconds',
+    'Time spent in each pipeline stage.',
+    ('stage',),
+)
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    'podlevel_upstream_request_duration_seconds',
+    'Latency of YouTube Data API requests, per attempt.',
+    ('endpoint',),
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    'podlevel_upstream_requests_total',
+    'YouTube Data API requests by endpoint and HTTP status (error = no response).',
+    ('endpoint', 'status'),
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    'podlevel_upstream_retries_total',
+    'YouTube Data API requests that were retries of a failed attempt.',
+    ('endpoint',),
+)
+UPSTREAM_BYTES = REGISTRY.counter(
+    'podlevel_upstream_response_bytes_total',
+    'Response body bytes received from the YouTube Data API.',
+    ('endpoint',),
+)
+QUOTA_UNITS = REGISTRY.counter(
+    'podlevel_quota_units_total',
+    'Estimated YouTube Data API quota units spent.',
+    ('endpoint',),
+)
+
+
+class ServerTimings:
+    """Per-request stage durations, summed by name, for a Server-Timing header."""
+
+    def __init__(self):
+        self._durations = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self._durations[name] = self._durations.get(name, 0.0) + seconds
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return dict(self._durations)
+
+    def header(self) -> str:
+        return ', '.join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.to_dict().items())
+
+
+_timings = contextvars.ContextVar('server_timings', default=None)
+
+
+@contextmanager
+def collect_timings():
+    """Collect stage() durations in this context (and copies of it) into a ServerTimings."""
+    timings = ServerTimings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block into the stage histogram and the active ServerTimings, if any."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings.add(name, elapsed)
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_upstream(endpoint: str, status, units: float, nbytes: int, seconds: float, retry: bool = False):
+    """Account one upstream API attempt."""
+    UPSTREAM_REQUESTS.inc(endpoint=endpoint, status=str(status))
+    UPSTREAM_SECONDS.observe(seconds, endpoint=endpoint)
+    QUOTA_UNITS.inc(units, endpoint=endpoint)
+    if nbytes:
+        UPSTREAM_BYTES.inc(nbytes, endpoint=endpoint)
+    if retry:
+        UPSTREAM_RETRIES.inc(endpoint=endpoint)
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(f"upstream_{endpoint}", seconds)
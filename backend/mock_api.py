@@ -0,0 +1,298 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def parse_fields_mask(mask: str) -> dict:
+    """Parse a partial-response `fields` mask into a selection tree.
+
+    Leaves map to None (keep the whole value); `a/b` and `a(b,c)` nest.
+    """
+    def parse(i):
+        tree = {}
+        while i < len(mask):
+            j = i
+            while j < len(mask) and mask[j] not in ',()':
+                j += 1
+            *parents, last = mask[i:j].strip().split('/')
+            node = tree
+            for name in parents:
+                if node.get(name) is None:
+                    node[name] = {}
+                node = node[name]
+            i = j
+            if i < len(mask) and mask[i] == '(':
+                node[last], i = parse(i + 1)
+                i += 1  # closing ')'
+            else:
+                node[last] = None
+            if i < len(mask) and mask[i] == ')':
+                return tree, i
+            i += 1  # ','
+        return tree, i
+
+    return parse(0)[0]
+
+
+def apply_fields_mask(value, tree):
+    """Keep only the parts of a JSON value selected by a parse_fields_mask tree."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [apply_fields_mask(v, tree) for v in value]
+    if isinstance(value, dict):
+        return {k: apply_fields_mask(value[k], sub) for k, sub in tree.items() if k in value}
+    return value
+
+
+def _select_parts(resource: dict, part: str) -> dict:
+    keep = {'kind', 'etag', 'id'} | set(part.split(','))
+    return {k: v for k, v in resource.items() if k in keep}
+
+
+def synthetic_videos(n: int, seed: int = 0, channel_id: str = 'UCmock') -> list:
+    """Generate n fake `videos.list` items for a channel, newest first."""
+    rng = random.Random(seed)
+    start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    # Roughly daily uploads, compressed so even huge channels span ~10 years
+    spacing = min(30 * 3600, 10 * 365 * 86400 // max(n, 1))
+    videos = []
+    for i in range(n):
+        published = start + timedelta(seconds=i * spacing + rng.randint(0, spacing * 2 // 3))
+        hours, minutes, seconds = rng.randint(0, 3), rng.randint(0, 59), rng.randint(0, 59)
+        duration = f"PT{hours}H{minutes}M{seconds}S" if hours else f"PT{minutes}M{seconds}S"
+        title = f"Episode {i}: " + "guest " * rng.randint(0, 10)
+        description = "Show notes and sponsor links. " * rng.randint(0, 40)
+        video_id = f"{channel_id[-4:]}{i:07d}"
+        videos.append({
+            'kind': 'youtube#video',
+            'etag': f"etag-{video_id}-{seed}",
+            'id': video_id,
+            'snippet': {
+                'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'channelId': channel_id,
+                'title': title,
+                'description': description,
+                'thumbnails': {
+                    size: {
+                        'url': f"https://i.ytimg.com/vi/{video_id}/{size}.jpg",
+                        'width': w,
+                        'height': h,
+                    }
+                    for size, w, h in (('default', 120, 90), ('medium', 320, 180), ('high', 480, 360))
+                },
+                'channelTitle': 'Mock Podcast',
+                'tags': ['podcast'] * rng.randint(0, 8),
+                'categoryId': rng.choice(['22', '24', '27', '28']),
+                'liveBroadcastContent': 'none',
+                'localized': {'title': title, 'description': description},
+            },
+            'contentDetails': {
+                'duration': duration,
+                'dimension': '2d',
+                'definition': 'hd',
+                'caption': rng.choice(['true', 'false']),
+                'licensedContent': True,
+                'contentRating': {},
+                'projection': 'rectangular',
+            },
+            'statistics': {
+                'viewCount': str(rng.randint(100, 2_000_000)),
+                'likeCount': str(rng.randint(0, 50_000)),
+                'favoriteCount': '0',
+                'commentCount': str(rng.randint(0, 5_000)),
+            },
+        })
+    videos.reverse()
+    return videos
+
+
+class MockYouTubeAPI:
+    """Local HTTP stand-in for the channels, playlistItems and videos endpoints.
+
+    Point Requester.API_BASE at base_url to run the real client against it.
+    Every response waits `latency` seconds; a fraction `error_rate` of
+    requests fails with `error_status` instead. `counts` tallies requests
+    per endpoint and `errors` the injected failures. Responses carry an ETag
+    of their body and a matching If-None-Match gets a bodiless 304, counted
+    in `not_modified`.
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, error_status: int = 503, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.errors = 0
+        self.not_modified = 0
+        self._rng = random.Random(seed)
+        self.channels = {}
+        self.handles = {}
+        self.videos = {}
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def add_channel(self, channel_id: str, videos: list, handle: str | None = None):
+        """Serve `videos` (newest first) as the uploads playlist of channel_id."""
+        self.channels[channel_id] = [v['id'] for v in videos]
+        for video in videos:
+            self.videos[video['id']] = video
+        if handle:
+            self.handles[handle.lstrip('@').lower()] = channel_id
+        return self
+
+    def update_video(self, video_id: str, **statistics):
+        """Change a video's statistics (e.g. viewCount=1234) and, as upstream does, its etag."""
+        with self._lock:
+            video = self.videos[video_id]
+            video['statistics'] = {**video['statistics'], **{k: str(v) for k, v in statistics.items()}}
+            revision = hashlib.md5(json.dumps(video['statistics'], sort_keys=True).encode('utf-8')).hexdigest()
+            video['etag'] = f"etag-{video_id}-{revision[:8]}"
+        return self
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/youtube/v3"
+
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as separate writes; without this, Nagle +
+            # delayed ACK adds ~40 ms to every keep-alive request
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                endpoint = parsed.path.rsplit('/', 1)[-1]
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                with api._lock:
+                    api.counts[endpoint] = api.counts.get(endpoint, 0) + 1
+                    fail = api.error_rate and api._rng.random() < api.error_rate
+                    if fail:
+                        api.errors += 1
+                if api.latency:
+                    time.sleep(api.latency)
+                if fail:
+                    self._send(api.error_status, {'error': {'code': api.error_status, 'message': 'Injected failure'}})
+                    return
+                handler = getattr(api, f"_handle_{endpoint}", None)
+                if handler is None:
+                    self._send(404, {'error': {'code': 404, 'message': 'Not Found'}})
+                    return
+                payload = handler(params)
+                if params.get('fields'):
+                    payload = apply_fields_mask(payload, parse_fields_mask(params['fields']))
+                body = json.dumps(payload).encode('utf-8')
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    with api._lock:
+                        api.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self._send(200, payload, body, etag)
+
+            def _send(self, status, payload, body=None, etag=None):
+                if body is None:
+                    body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(body)))
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handle_channels(self, params):
+        if 'forHandle' in params:
+            channel_id = self.handles.get(params['forHandle'].lstrip('@').lower())
+            ids = [channel_id] if channel_id else []
+        else:
+            ids = [c for c in params.get('id', '').split(',') if c in self.channels]
+        return {
+            'kind': 'youtube#channelListResponse',
+            'items': [
+                _select_parts({
+                    'kind': 'youtube#channel',
+                    'id': cid,
+                    'contentDetails': {'relatedPlaylists': {'likes': '', 'uploads': 'UU' + cid[2:]}},
+                }, params.get('part', 'id'))
+                for cid in ids[:50]
+            ],
+        }
+
+    def _handle_playlistItems(self, params):
+        channel_id = 'UC' + params.get('playlistId', '')[2:]
+        video_ids = self.channels.get(channel_id, [])
+        start = int(params.get('pageToken') or 0)
+        page_size = min(int(params.get('maxResults', 5)), 50)
+        page = video_ids[start:start + page_size]
+        part = params.get('part', 'snippet')
+        data = {
+            'kind': 'youtube#playlistItemListResponse',
+            'items': [
+                _select_parts({
+                    'kind': 'youtube#playlistItem',
+                    'id': f"PLI{vid}",
+                    'snippet': {
+                        'publishedAt': self.videos[vid]['snippet']['publishedAt'],
+                        'channelId': channel_id,
+                        'title': self.videos[vid]['snippet']['title'],
+                        'description': self.videos[vid]['snippet']['description'],
+                        'thumbnails': self.videos[vid]['snippet']['thumbnails'],
+                        'playlistId': params.get('playlistId'),
+                        'position': start + i,
+                        'resourceId': {'kind': 'youtube#video', 'videoId': vid},
+                    },
+                    'contentDetails': {
+                        'videoId': vid,
+                        'videoPublishedAt': self.videos[vid]['snippet']['publishedAt'],
+                    },
+                }, part)
+                for i, vid in enumerate(page)
+            ],
+            'pageInfo': {'totalResults': len(video_ids), 'resultsPerPage': page_size},
+        }
+        if start + page_size < len(video_ids):
+            data['nextPageToken'] = str(start + page_size)
+        return data
+
+    def _handle_videos(self, params):
+        ids = [v for v in params.get('id', '').split(',') if v in self.videos]
+        return {
+            'kind': 'youtube#videoListResponse',
+            'items': [_select_parts(self.videos[v], params.get('part', 'snippet')) for v in ids],
+            'pageInfo': {'totalResults': len(ids), 'resultsPerPage': len(ids)},
+        }
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """Last-good channel results with background refresh (stale-while-revalidate).
+
+    `fetch(channel_id)` returns fresh data; empty/None results are treated as
+    failures and never replace a good entry. Channels in `watchlist` are
+    refreshed every `interval` seconds by a daemon thread; any entry older
+    than `stale_after` seconds can be revalidated on demand via revalidate().
+    `on_refresh(channel_id, data)` runs after each successful refresh, e.g.
+    to warm feature and model caches. `prefetch(watchlist)`, if given, runs
+    once before each watchlist pass, e.g. to resolve all channels in bulk.
+    `key(channel)`, if given, maps each watchlist entry (e.g. a @handle) to
+    the channel ID that lookups get() and put() under.
+
+    At most `max_entries` channels are kept, least recently used evicted
+    first. `fetched_at(channel_id)`, if given, returns when the data just
+    fetched was actually fetched upstream (e.g. a store's last refresh), so
+    ages don't restart at 0 for data served from storage.
+    """
+
+    def __init__(self, fetch, watchlist=(), interval: float = 900.0, stale_after: float = 300.0,
+                 workers: int = 2, on_refresh=None, prefetch=None, max_entries: int = 128, fetched_at=None,
+                 key=None):
+        self.fetch = fetch
+        self.watchlist = list(watchlist)
+        self.interval = interval
+        self.stale_after = stale_after
+        self.on_refresh = on_refresh
+        self.prefetch = prefetch
+        self.max_entries = max_entries
+        self.fetched_at = fetched_at
+        self.key = key
+        self._entries = OrderedDict()  # channel_id -> (data, fetched_at epoch seconds), LRU order
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='refresh')
+
+    def start(self):
+        """Refresh the watchlist now and then every `interval` seconds (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    def _run(self):
+        while True:
+            self.refresh_watchlist()
+            if self._stop.wait(self.interval):
+                return
+
+    def refresh_watchlist(self):
+        """One watchlist pass: prefetch, then schedule a refresh of every entry."""
+        if self.prefetch is not None and self.watchlist:
+            try:
+                self.prefetch(self.watchlist)
+            except Exception:
+                logger.exception("Watchlist prefetch failed")
+        for channel in self.watchlist:
+            self.revalidate(self._key(channel))
+
+    def _key(self, channel: str) -> str:
+        if self.key is None:
+            return channel
+        try:
+            return self.key(channel)
+        except Exception:
+            logger.exception("Could not resolve watchlist entry %s", channel)
+            return channel
+
+    def get(self, channel_id: str):
+        """Return (data, age_seconds) of the last good result, or (None, None)."""
+        with self._lock:
+            entry = self._entries.get(channel_id)
+            if entry is not None:
+                self._entries.move_to_end(channel_id)
+        if entry is None:
+            return None, None
+        data, fetched_at = entry
+        return data, max(0.0, time.time() - fetched_at)
+
+    def put(self, channel_id: str, data, fetched_at: float | None = None):
+        """Keep `data` as the channel's last good result, fetched upstream at `fetched_at` (default now)."""
+        if data:
+            with self._lock:
+                self._entries[channel_id] = (data, time.time() if fetched_at is None else fetched_at)
+                self._entries.move_to_end(channel_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def is_stale(self, age: float | None) -> bool:
+        return age is None or age > self.stale_after
+
+    def revalidate(self, channel_id: str) -> bool:
+        """Schedule a background refresh unless one is already running."""
+        with self._lock:
+            if channel_id in self._inflight:
+                return False
+            self._inflight.add(channel_id)
+        try:
+            self._pool.submit(self._refresh, channel_id)
+        except RuntimeError:  # pool shut down
+            with self._lock:
+                self._inflight.discard(channel_id)
+            return False
+        return True
+
+    def _refresh(self, channel_id: str):
+        try:
+            data = self.fetch(channel_id)
+            self.put(channel_id, data, self.fetched_at(channel_id) if self.fetched_at is not None else None)
+            if data and self.on_refresh is not None:
+                self.on_refresh(channel_id, data)
+        except Exception:
+            logger.exception("Background refresh of %s failed", channel_id)
+        finally:
+            with self._lock:
+                self._inflight.discard(channel_id)
@@ -0,0 +1,384 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from utils import Formatter
+
+
+class VideoStore:
+    """SQLite-backed store of raw video details, keyed by channel.
+
+    Lets Requester refresh a channel incrementally: only uploads newer than
+    the most recent stored video need to be paged and fetched, and stored
+    videos are re-pulled for fresh statistics in 50-ID videos.list calls.
+    `refreshed_at` is when the stored statistics were last fetched upstream.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS videos (
+                    channel_id TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    published_at TEXT,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (channel_id, video_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_videos_channel_published
+                    ON videos (channel_id, published_at);
+                CREATE TABLE IF NOT EXISTS channels (
+                    channel_id TEXT PRIMARY KEY,
+                    refreshed_at REAL NOT NULL
+                );
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def video_ids(self, channel_id: str) -> list:
+        """Return the videoIds stored for a channel, newest first (get_videos order)."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT video_id FROM videos WHERE channel_id = ? "
+                "ORDER BY published_at DESC, video_id",
+                (channel_id,),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def get_videos(self, channel_id: str) -> list:
+        """Return stored video details for a channel, newest first."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT data FROM videos WHERE channel_id = ? "
+                "ORDER BY published_at DESC, video_id",
+                (channel_id,),
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def iter_videos(self, channel_id: str, batch_size: int = 500):
+        """Yield stored video details in batches, newest first (get_videos order),
+        without materializing the whole channel.
+        """
+        # Own connection for the life of the iteration; the lock isn't held across yields
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT data FROM videos WHERE channel_id = ? "
+                "ORDER BY published_at DESC, video_id",
+                (channel_id,),
+            )
+            while rows := cursor.fetchmany(batch_size):
+                yield [json.loads(r[0]) for r in rows]
+        finally:
+            conn.close()
+
+    def add_videos(self, channel_id: str, videos: list):
+        """Insert or replace video details (see mark_refreshed for the channel's age)."""
+        rows = []
+        for video in videos:
+            vid = video.get('id')
+            if not vid:
+                continue
+            published_at = (video.get('snippet') or {}).get('publishedAt')
+            rows.append((channel_id, vid, published_at, json.dumps(video)))
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO videos (channel_id, video_id, published_at, data) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def remove_videos(self, channel_id: str, video_ids):
+        """Drop stored videos, e.g. ones deleted or made private upstream."""
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM videos WHERE channel_id = ? AND video_id = ?",
+                [(channel_id, vid) for vid in video_ids],
+            )
+
+    def mark_refreshed(self, channel_id: str, at: float | None = None):
+        """Record that every stored video's statistics were fetched upstream at `at` (default now)."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO channels (channel_id, refreshed_at) VALUES (?, ?)",
+                (channel_id, time.time() if at is None else at),
+            )
+
+    def refreshed_at(self, channel_id: str):
+        """Return the epoch seconds of the last statistics refresh, or None if never stored."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT refreshed_at FROM channels WHERE channel_id = ?",
+                (channel_id,),
+            ).fetchone()
+        return row[0] if row else None
+
+
+class ChannelDirectory:
+    """SQLite-backed directory of handle -> channelId -> uploads playlist ID.
+
+    These mappings almost never change, so entries are trusted for `ttl`
+    seconds (default 30 days) and let Requester skip the `channels` round
+    trips on repeat lookups. Handles are stored lowercased without the '@'.
+    Misses are not cached.
+    """
+
+    def __init__(self, path: str, ttl: float = 30 * 86400):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS directory_handles (
+                    handle TEXT PRIMARY KEY,
+                    channel_id TEXT NOT NULL,
+                    resolved_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS directory_channels (
+                    channel_id TEXT PRIMARY KEY,
+                    uploads_playlist_id TEXT NOT NULL,
+                    resolved_at REAL NOT NULL
+                );
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _handle_key(handle: str) -> str:
+        return handle.lstrip('@').lower()
+
+    def channel_for_handle(self, handle: str):
+        """Return the channelId for an @handle, or None if unknown or expired."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT channel_id FROM directory_handles WHERE handle = ? AND resolved_at > ?",
+                (self._handle_key(handle), time.time() - self.ttl),
+            ).fetchone()
+        return row[0] if row else None
+
+    def uploads_for_channels(self, channel_ids) -> dict:
+        """Return {channelId: uploads playlist ID} for the fresh entries among channel_ids."""
+        channel_ids = list(channel_ids)
+        found = {}
+        with self._lock, self._connect() as conn:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(channel_ids), 500):
+                batch = channel_ids[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT channel_id, uploads_playlist_id FROM directory_channels "
+                    f"WHERE channel_id IN ({','.join('?' * len(batch))}) AND resolved_at > ?",
+                    (*batch, time.time() - self.ttl),
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def uploads_for_channel(self, channel_id: str):
+        """Return the uploads playlist ID for a channel, or None if unknown or expired."""
+        return self.uploads_for_channels([channel_id]).get(channel_id)
+
+    def add_handle(self, handle: str, channel_id: str):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO directory_handles (handle, channel_id, resolved_at) VALUES (?, ?, ?)",
+                (self._handle_key(handle), channel_id, time.time()),
+            )
+
+    def add_channels(self, uploads_by_channel: dict):
+        """Record {channelId: uploads playlist ID} mappings."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO directory_channels (channel_id, uploads_playlist_id, resolved_at) "
+                "VALUES (?, ?, ?)",
+                [(cid, uploads, now) for cid, uploads in uploads_by_channel.items() if cid and uploads],
+            )
+
+
+class FeatureStore:
+    """Per-channel on-disk cache of Formatter.videos_to_dataframe output.
+
+    Each channel directory holds the float64 feature matrix as a `.npy` file
+    (memory-mapped on load) plus a meta.json with its columns, row videoIds
+    and the Formatter.FEATURE_SCHEMA_VERSION it was built with. New videos
+    are run through Formatter on their own and appended; a schema version
+    change, a new `cat_*` category, or videos that would shift existing rows'
+    time features (older uploads, deletions) trigger a full rebuild, as does
+    a stored video whose other inputs (publish time, duration, category,
+    captions, tag count, title or description length) changed upstream:
+    meta.json keeps a fingerprint of those per row. Stored rows whose
+    statistics changed get those columns rewritten. Channels without
+    videos are never written.
+
+    meta.json also records a `generation` that changes whenever stored rows
+    change (rebuilds, statistics rewrites) but not on appends. features()
+    returns it in the frame's attrs['generation'], so models built up
+    row by row can tell when their earlier rows are no longer valid.
+    """
+
+    STAT_COLUMNS = ('viewCount', 'likeCount', 'commentCount')
+
+    @staticmethod
+    def fingerprint(video) -> int:
+        """Checksum of everything besides statistics that a video's feature row is computed from."""
+        snippet = video.get('snippet') or {}
+        content_details = video.get('contentDetails') or {}
+        key = (
+            f"{snippet.get('publishedAt')}\x1f{content_details.get('duration')}\x1f{content_details.get('caption')}"
+            f"\x1f{snippet.get('categoryId')}\x1f{len(snippet.get('tags') or ())}"
+            f"\x1f{len(snippet.get('title') or '')}\x1f{len(snippet.get('description') or '')}"
+        )
+        return zlib.crc32(key.encode('utf-8'))
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _channel_dir(self, channel_id: str) -> str:
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9_@.-]', '_', channel_id))
+
+    def load(self, channel_id: str):
+        """Return (meta, memory-mapped matrix) for a channel, or (None, None)."""
+        meta_path = os.path.join(self._channel_dir(channel_id), 'meta.json')
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            matrix = np.load(os.path.join(self._channel_dir(channel_id), meta['file']), mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None, None
+        if meta.get('schema_version') != Formatter.FEATURE_SCHEMA_VERSION:
+            return None, None
+        return meta, matrix
+
+    def features(self, channel_id: str, videos_json) -> pd.DataFrame:
+        """Feature frame for videos_json (same rows/order as videos_to_dataframe),
+        computing features only for videos not already stored.
+        """
+        if not videos_json:
+            return Formatter.videos_to_dataframe(videos_json)  # nothing worth storing
+        video_ids = [v.get('id') for v in videos_json]
+        fingerprints = [self.fingerprint(v) for v in videos_json]
+        with self._lock:
+            meta, matrix = self.load(channel_id)
+            if meta is not None and len(set(video_ids)) == len(video_ids):
+                stored_ids = meta['video_ids']
+                stored_fingerprints = dict(zip(stored_ids, meta.get('fingerprints') or []))
+                new_videos = [v for v in videos_json if v.get('id') not in stored_fingerprints]
+                unchanged = len(stored_fingerprints) == len(stored_ids) and all(
+                    stored_fingerprints.get(vid, fp) == fp for vid, fp in zip(video_ids, fingerprints)
+                )
+                if unchanged and len(stored_ids) + len(new_videos) == len(video_ids):
+                    if new_videos:
+                        appended = self._append(channel_id, meta, matrix, new_videos)
+                        if appended is not None:
+                            meta, matrix = appended
+                    if not new_videos or appended is not None:
+                        meta, matrix = self._refresh_stats(channel_id, meta, matrix, videos_json)
+                        df = self._frame(meta, matrix, video_ids)
+                        df.attrs['generation'] = meta.get('generation')
+                        return df
+
+            # Cold channel or invalidated cache: rebuild from the full video list
+            df = Formatter.videos_to_dataframe(videos_json)
+            meta, _ = self._save(channel_id, list(df.columns), video_ids, fingerprints, df.to_numpy(dtype='float64'))
+            df.attrs['generation'] = meta.get('generation') if meta is not None else None
+            return df
+
+    def _append(self, channel_id, meta, matrix, new_videos):
+        columns = meta['columns']
+        new_df = Formatter.videos_to_dataframe(new_videos)
+        if not set(new_df.columns) <= set(columns):
+            return None  # new category -> one-hot schema changed
+        ts = new_df['publishedTimestamp'].to_numpy()
+        stored_ts = np.asarray(matrix[:, columns.index('publishedTimestamp')])
+        if len(stored_ts) == 0 or (ts <= 0).any() or ts.min() < stored_ts.max() or stored_ts.min() <= 0:
+            return None  # would shift origin/cadence of stored rows
+
+        # Re-anchor the time features that new_df computed relative to itself
+        # (whole days, truncated like Formatter's timedelta64[s] arithmetic)
+        new_df = new_df.reindex(columns=columns, fill_value=0.0)
+        origin = stored_ts.min()
+        new_df['daysSinceOrigination'] = (ts - origin) // (24 * 3600)
+        order = np.argsort(ts, kind='stable')
+        sorted_ts = ts[order]
+        prev = np.concatenate([[stored_ts.max()], sorted_ts[:-1]])
+        gaps = np.empty(len(ts))
+        gaps[order] = (sorted_ts - prev) // (24 * 3600)
+        new_df['daysSinceLastVideo'] = gaps
+
+        combined = np.concatenate([np.asarray(matrix), new_df.to_numpy(dtype='float64')])
+        video_ids = meta['video_ids'] + [v.get('id') for v in new_videos]
+        fingerprints = meta['fingerprints'] + [self.fingerprint(v) for v in new_videos]
+        # Existing rows are untouched, so the generation carries over
+        return self._save(channel_id, columns, video_ids, fingerprints, combined, generation=meta.get('generation'))
+
+    def _refresh_stats(self, channel_id, meta, matrix, videos_json):
+        """Rewrite the statistics columns if any video's counts changed since stored."""
+        columns = [meta['columns'].index(c) for c in self.STAT_COLUMNS]
+        position = {vid: i for i, vid in enumerate(meta['video_ids'])}
+        rows = np.fromiter((position[v.get('id')] for v in videos_json), dtype=np.int64, count=len(videos_json))
+        stats = np.array(
+            [[int((v.get('statistics') or {}).get(c, 0) or 0) for c in self.STAT_COLUMNS] for v in videos_json],
+            dtype='float64',
+        ).reshape(len(videos_json), len(columns))
+        if np.array_equal(matrix[np.ix_(rows, columns)], stats):
+            return meta, matrix
+        updated = np.array(matrix)
+        updated[np.ix_(rows, columns)] = stats
+        return self._save(channel_id, meta['columns'], meta['video_ids'], meta['fingerprints'], updated)
+
+    def _save(self, channel_id, columns, video_ids, fingerprints, matrix, generation=None):
+        channel_dir = self._channel_dir(channel_id)
+        os.makedirs(channel_dir, exist_ok=True)
+        meta_path = os.path.join(channel_dir, 'meta.json')
+        old_file = None
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path, encoding='utf-8') as f:
+                    old_file = json.load(f).get('file')
+            except (OSError, ValueError):
+                pass
+        # New file name per write so readers holding an old memory map are unaffected
+        file_name = f"features.{time.time_ns()}.npy"
+        np.save(os.path.join(channel_dir, file_name), matrix)
+        meta = {
+            'schema_version': Formatter.FEATURE_SCHEMA_VERSION,
+            'columns': columns,
+            'video_ids': video_ids,
+            'fingerprints': fingerprints,
+            'file': file_name,
+            'generation': generation or time.time_ns(),
+        }
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+        if old_file and old_file != file_name:
+            try:
+                os.remove(os.path.join(channel_dir, old_file))
+            except OSError:
+                pass  # still mapped elsewhere (Windows); harmless leftover
+        return self.load(channel_id)
+
+    @staticmethod
+    def _frame(meta, matrix, video_ids) -> pd.DataFrame:
+        if meta['video_ids'] == video_ids:
+            values = matrix  # zero-copy view of the memory map
+        else:
+            position = {vid: i for i, vid in enumerate(meta['video_ids'])}
+            values = np.asarray(matrix)[[position[vid] for vid in video_ids]]
+        return pd.DataFrame(values, columns=meta['columns'], copy=False)
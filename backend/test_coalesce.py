@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from mock_api import MockYouTubeAPI, synthetic_videos
+from store import ChannelDirectory
+from utils import ML_Tools, Requester, ResultCache
+
+
+class CoalescedLookupTest(unittest.TestCase):
+    """Parallel cold lookups of one channel, by @handle and by ID, share one
+    upstream fetch and one model fit."""
+
+    VIDEOS = 500
+    PARALLEL = 16
+
+    def setUp(self):
+        self.scratch = tempfile.mkdtemp(prefix='podlevel-test-')
+        self.addCleanup(shutil.rmtree, self.scratch, ignore_errors=True)
+        with mock.patch.dict(os.environ, {
+            'VIDEO_STORE_PATH': os.path.join(self.scratch, 'videos.sqlite3'),
+            'FEATURE_STORE_DIR': os.path.join(self.scratch, 'features'),
+        }):
+            import app as backend_app
+        self.app = backend_app
+
+        self.api = MockYouTubeAPI(latency=0.02).start()
+        self.addCleanup(self.api.stop)
+        self.api.add_channel('UCcoalesce', synthetic_videos(self.VIDEOS), handle='@coalesce')
+
+        for name, value in {
+            'API_BASE': self.api.base_url,
+            'api_key': 'test',
+            'video_store': None,
+            'etag_cache': None,
+            'limiter': None,
+            'channel_directory': ChannelDirectory(os.path.join(self.scratch, 'directory.sqlite3')),
+        }.items():
+            patcher = mock.patch.object(Requester, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.fits = []
+        run_linear_regression = ML_Tools.run_linear_regression
+
+        def counting_fit(*args, **kwargs):
+            self.fits.append(1)
+            return run_linear_regression(*args, **kwargs)
+
+        for patcher in (
+            mock.patch.object(ML_Tools, 'run_linear_regression', staticmethod(counting_fit)),
+            mock.patch.object(ML_Tools, 'result_cache', ResultCache(maxsize=16, ttl=600)),
+            mock.patch.object(self.app.scheduler, 'put'),  # keep every lookup cold
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_handle_and_id_lookups_share_one_fetch_and_fit(self):
+        client = self.app.app.test_client()
+        barrier = threading.Barrier(self.PARALLEL)
+        statuses = []
+
+        def lookup(channel):
+            barrier.wait()
+            statuses.append(client.get(f'/api/channel/{channel}/videos').status_code)
+
+        threads = [
+            threading.Thread(target=lookup, args=('@coalesce' if i % 2 else 'UCcoalesce',))
+            for i in range(self.PARALLEL)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        pages = (self.VIDEOS + 49) // 50
+        self.assertEqual(statuses, [200] * self.PARALLEL)
+        self.assertEqual(self.api.counts['playlistItems'], pages)
+        self.assertEqual(self.api.counts['videos'], pages)
+        # One forHandle resolution, plus the uploads lookup if an ID caller led the fetch
+        self.assertLessEqual(self.api.counts['channels'], 2)
+        self.assertEqual(len(self.fits), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from utils import Formatter
+
+
+def reference_lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets as in Steinarsson's thesis, one point at a time."""
+    n = len(x)
+    if threshold >= n or n <= 2:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+        max_area, next_a = -1.0, None
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) * 0.5
+            if area > max_area:
+                max_area, next_a = area, j
+        kept.append(next_a)
+        a = next_a
+    kept.append(n - 1)
+    return kept
+
+
+class LttbTest(unittest.TestCase):
+    """Formatter.lttb keeps the same points as the reference algorithm."""
+
+    def test_matches_reference(self):
+        rng = np.random.default_rng(7)
+        for n, threshold in ((10, 3), (100, 10), (1000, 37), (5000, 500), (2001, 2000)):
+            x = np.sort(rng.uniform(0, 1e6, n))
+            y = rng.lognormal(8, 2, n)
+            with self.subTest(n=n, threshold=threshold):
+                self.assertEqual(
+                    Formatter.lttb(x, y, threshold).tolist(),
+                    reference_lttb(x.tolist(), y.tolist(), threshold),
+                )
+
+    def test_short_series_are_kept_whole(self):
+        self.assertEqual(Formatter.lttb([1, 2, 3], [3, 1, 2], 10).tolist(), [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import copy
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from mock_api import synthetic_videos
+from store import FeatureStore
+from utils import ML_Tools, ResultCache
+
+
+class IncrementalRegressionTest(unittest.TestCase):
+    """ML_Tools.incremental_regression matches a standardized OLS fit on all
+    rows after appends, older uploads and statistics changes."""
+
+    def setUp(self):
+        root = tempfile.mkdtemp(prefix='podlevel-test-')
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.store = FeatureStore(root)
+        self.videos = synthetic_videos(300, channel_id='UCml')  # newest first
+        patcher = mock.patch.object(ML_Tools, 'incremental_models', ResultCache(maxsize=4, ttl=float('inf')))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def incremental(self, videos):
+        features = self.store.features('UCml', videos)
+        result = ML_Tools.incremental_regression(
+            'UCml', features, [v['id'] for v in videos], generation=features.attrs.get('generation')
+        )
+        return features, result
+
+    def assertMatchesFullFit(self, features, result):
+        X = features.drop(columns=['viewCount'])
+        y = features['viewCount'].to_numpy(dtype='float64').reshape(-1, 1)
+        full = LinearRegression().fit(
+            StandardScaler().fit_transform(X), StandardScaler().fit_transform(y).ravel()
+        )
+        coefficients = np.array([result['coefficients'][c] for c in X.columns])
+        np.testing.assert_allclose(coefficients, full.coef_, rtol=0, atol=1e-7)
+        self.assertEqual(result['n_train'], len(features))
+
+    def test_appends_match_a_full_fit(self):
+        self.incremental(self.videos[20:290])
+        for step in (self.videos[10:290], self.videos[:290]):
+            self.assertMatchesFullFit(*self.incremental(step))
+
+    def test_rebuilt_rows_match_a_full_fit(self):
+        self.incremental(self.videos[10:290])
+        older = self.videos[10:]  # uploads older than every stored row
+        self.assertMatchesFullFit(*self.incremental(older))
+
+        changed = copy.deepcopy(older)
+        changed[3]['statistics']['viewCount'] = str(10 ** 8)
+        self.assertMatchesFullFit(*self.incremental(changed))
+
+    def test_models_are_bounded(self):
+        videos = self.videos[:50]
+        features = self.store.features('UCml', videos)
+        for i in range(10):
+            ML_Tools.incremental_regression(f'UCml{i}', features, [v['id'] for v in videos])
+        self.assertEqual(ML_Tools.incremental_models.stats()['size'], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from collections import OrderedDict
+from unittest import mock
+
+from mock_api import MockYouTubeAPI, synthetic_videos
+from store import ChannelDirectory, FeatureStore, VideoStore
+from utils import ML_Tools, Requester, ResultCache
+
+
+class WatchlistTest(unittest.TestCase):
+    """A watchlisted @handle is refreshed under its channel ID, so lookups by
+    handle are served from the scheduler."""
+
+    def setUp(self):
+        self.scratch = tempfile.mkdtemp(prefix='podlevel-test-')
+        self.addCleanup(shutil.rmtree, self.scratch, ignore_errors=True)
+        with mock.patch.dict(os.environ, {
+            'VIDEO_STORE_PATH': os.path.join(self.scratch, 'videos.sqlite3'),
+            'FEATURE_STORE_DIR': os.path.join(self.scratch, 'features'),
+        }):
+            import app as backend_app
+        self.app = backend_app
+
+        self.api = MockYouTubeAPI().start()
+        self.addCleanup(self.api.stop)
+        self.api.add_channel('UCprobe', synthetic_videos(120, channel_id='UCprobe'), handle='@probe')
+
+        self.features_dir = os.path.join(self.scratch, 'features')
+        scheduler = self.app.scheduler
+        for target, name, value in (
+            (Requester, 'API_BASE', self.api.base_url),
+            (Requester, 'api_key', 'test'),
+            (Requester, 'video_store', VideoStore(os.path.join(self.scratch, 'videos.sqlite3'))),
+            (Requester, 'channel_directory', ChannelDirectory(os.path.join(self.scratch, 'videos.sqlite3'))),
+            (Requester, 'etag_cache', None),
+            (Requester, 'limiter', None),
+            (ML_Tools, 'result_cache', ResultCache(maxsize=16, ttl=600)),
+            (self.app, 'feature_store', FeatureStore(self.features_dir)),
+            (scheduler, 'watchlist', ['@probe']),
+            (scheduler, '_entries', OrderedDict()),
+            (scheduler, 'start', lambda: scheduler),  # no background thread; passes run by hand
+        ):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def wait_for(self, channel_id, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            data, _ = self.app.scheduler.get(channel_id)
+            if data is not None:
+                return data
+            time.sleep(0.01)
+        self.fail(f'{channel_id} was never refreshed')
+
+    def test_watchlisted_handle_is_served_from_the_scheduler(self):
+        self.app.scheduler.refresh_watchlist()
+        self.assertEqual(len(self.wait_for('UCprobe')), 120)
+        self.assertEqual(list(self.app.scheduler._entries), ['UCprobe'])
+
+        before = dict(self.api.counts)
+        resp = self.app.app.test_client().get('/api/channel/@probe/videos')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.get_json()['items']), 120)
+        self.assertEqual(self.api.counts, before)  # no inline fetch
+        self.assertEqual(os.listdir(self.features_dir), ['UCprobe'])
+
+
+if __name__ == '__main__':
+    unittest.main()
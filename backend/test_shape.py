@@ -0,0 +1,56 @@
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock_api import synthetic_videos
+from utils import DebugTools, ShapeInferencer
+
+
+class ShapeDriftTest(unittest.TestCase):
+    """Partial fetches never report optional fields they happen to lack as removed."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='podlevel-test-')
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.outfile = os.path.join(self.dir, 'shape.json')
+        self.baseline = os.path.join(self.dir, 'baseline.json')
+        self.videos = synthetic_videos(50)
+        for video in self.videos:
+            video['snippet']['tags'] = ['a', 'b']
+        DebugTools.create_response_shape_debug_example(self.videos, self.baseline)
+        DebugTools.create_response_shape_debug_example(self.videos, self.outfile)
+        self.untagged = copy.deepcopy(self.videos[:3])
+        for video in self.untagged:
+            del video['snippet']['tags']
+
+    def infer(self, items, complete, sample_size=None):
+        inferencer = ShapeInferencer(outfile=self.outfile, sample_size=sample_size, baseline=self.baseline).start()
+        inferencer.feed(items)
+        inferencer.close(complete=complete)
+        return inferencer.join(timeout=10)
+
+    def read_outfile(self):
+        with open(self.outfile, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_partial_fetch_reports_no_removed_paths_and_keeps_the_shape_file(self):
+        before = self.read_outfile()
+        inferencer = self.infer(self.untagged, complete=False)
+        self.assertEqual(inferencer.drift['removed'], [])
+        self.assertEqual(self.read_outfile(), before)
+
+    def test_sampled_fetch_counts_as_partial(self):
+        inferencer = self.infer(self.untagged * 20, complete=True, sample_size=10)
+        self.assertEqual(inferencer.drift['removed'], [])
+
+    def test_complete_fetch_reports_removed_paths(self):
+        inferencer = self.infer(self.untagged, complete=True)
+        self.assertIn('[].snippet.tags[]', inferencer.drift['removed'])
+        self.assertNotIn('tags', self.read_outfile()['list_item']['snippet'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from mock_api import synthetic_videos
+from store import FeatureStore
+from utils import Formatter
+
+
+class FeatureStoreTest(unittest.TestCase):
+    """FeatureStore.features matches Formatter.videos_to_dataframe however the
+    channel changed, and bumps the generation whenever stored rows change."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='podlevel-test-')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.store = FeatureStore(self.root)
+        self.videos = synthetic_videos(300, channel_id='UCstore')
+
+    def assertMatchesRebuild(self, df, videos):
+        pd.testing.assert_frame_equal(df, Formatter.videos_to_dataframe(videos), check_dtype=False)
+
+    def test_appends_match_a_rebuild_and_keep_the_generation(self):
+        first = self.store.features('UCstore', self.videos[20:])
+        for step in (self.videos[10:], self.videos):
+            df = self.store.features('UCstore', step)
+            self.assertMatchesRebuild(df, step)
+            self.assertEqual(df.attrs['generation'], first.attrs['generation'])
+
+    def test_older_upload_rebuilds_with_a_new_generation(self):
+        first = self.store.features('UCstore', self.videos[:290])
+        df = self.store.features('UCstore', self.videos)
+        self.assertMatchesRebuild(df, self.videos)
+        self.assertNotEqual(df.attrs['generation'], first.attrs['generation'])
+
+    def test_statistics_rewrite_changes_the_generation(self):
+        first = self.store.features('UCstore', self.videos)
+        changed = copy.deepcopy(self.videos)
+        changed[7]['statistics']['viewCount'] = str(10 ** 8)
+        df = self.store.features('UCstore', changed)
+        self.assertMatchesRebuild(df, changed)
+        self.assertNotEqual(df.attrs['generation'], first.attrs['generation'])
+        again = self.store.features('UCstore', changed)
+        self.assertEqual(again.attrs['generation'], df.attrs['generation'])
+
+    def test_edited_video_fields_reach_the_features(self):
+        first = self.store.features('UCstore', self.videos)
+        edited = copy.deepcopy(self.videos)
+        snippet = edited[5]['snippet']
+        snippet['title'] += ' (updated)'
+        snippet['tags'] = (snippet.get('tags') or []) + ['new tag']
+        edited[5]['contentDetails']['duration'] = 'PT1H2M3S'
+
+        df = self.store.features('UCstore', edited)
+        self.assertMatchesRebuild(df, edited)
+        self.assertNotEqual(df.attrs['generation'], first.attrs['generation'])
+
+    def test_channel_without_videos_is_not_stored(self):
+        df = self.store.features('UCnothing', [])
+        self.assertEqual(len(df), 0)
+        self.assertEqual(os.listdir(self.root), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
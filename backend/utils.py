@@ -1,13 +1,179 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import logging
+import numpy as np
 import pandas as pd
 import re
+import random
+import queue
+import threading
+import time
+import contextvars
+import hashlib
+import multiprocessing
+from collections import OrderedDict, deque
+import warnings
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from sklearn.preprocessing import StandardScaler
 
+from metrics import REGISTRY, record_upstream, stage, timed
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_DRIFT_PATHS = REGISTRY.counter(
+    'podlevel_schema_drift_paths_total',
+    'Response shape paths added, removed or changed versus the baseline shape.',
+    ('kind',),
+)
+
+class QuotaLimiter:
+    """Token bucket over YouTube Data API quota units.
+
+    Refills `rate` units per second up to `capacity`; acquire() blocks until
+    the requested units are available.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, units: float = 1):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Reserve now and sleep off any deficit outside the lock
+            self._tokens -= units
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class QuotaLedger:
+    """Quota units, requests and retries spent while tracking one request."""
+
+    def __init__(self):
+        self.units = 0
+        self.requests = {}
+        self.bytes = {}
+        self.retries = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, units: int, retry: bool = False):
+        with self._lock:
+            self.units += units
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            if retry:
+                self.retries += 1
+
+    def record_bytes(self, endpoint: str, nbytes: int):
+        with self._lock:
+            self.bytes[endpoint] = self.bytes.get(endpoint, 0) + nbytes
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'units': self.units,
+            'requests': dict(self.requests),
+            'bytes': dict(self.bytes),
+            'retries': self.retries,
+            'not_modified': self.not_modified,
+        }
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs fn; callers arriving while it is still
+    running wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
 class Requester:
     api_key = ""
     API_BASE = "https://www.googleapis.com/youtube/v3"
+    # Optional store.VideoStore; when set, channel fetches refresh incrementally
+    video_store = None
+    # Stored videos' statistics older than this (seconds) are re-pulled on fetch; 0 = every fetch
+    stats_ttl = 0.0
+    # Fetched videos are upserted into video_store in batches of this many
+    store_write_batch = 500
+    # Stored videos are handed to streaming callers in batches of this many
+    stream_batch_size = 500
+    # Optional store.ChannelDirectory caching handle -> channelId -> uploads playlist
+    channel_directory = None
+    # Optional ResultCache of request -> (ETag, body); when set, repeat requests
+    # revalidate with If-None-Match and a 304 reuses the cached body
+    etag_cache = None
+    # Max concurrent videos.list chunk requests (1 = fetch chunks serially)
+    max_workers = 8
+    # Shared keep-alive HTTP session, created lazily by get_session()
+    session = None
+    # Quota units charged per call, by endpoint (list calls cost 1 unit)
+    QUOTA_COSTS = {'channels': 1, 'playlistItems': 1, 'videos': 1, 'search': 100}
+    # Optional QuotaLimiter shared by all calls
+    limiter = None
+    # Retries for transient failures (429, 5xx, rate-limit 403s, connection errors)
+    max_retries = 4
+    backoff_base = 0.5
+    backoff_max = 16.0
+    _quota_ledger = contextvars.ContextVar('quota_ledger', default=None)
+    # Concurrent fetches of the same channel share one upstream fetch
+    _inflight = SingleFlight()
+    # Partial-response masks: only the fields Formatter and the frontend read
+    use_field_masks = True
+    FIELD_MASKS = {
+        'channels': 'items(id,contentDetails/relatedPlaylists/uploads)',
+        'playlistItems': 'nextPageToken,items/contentDetails/videoId',
+        'videos': (
+            'items(id,etag,'
+            'snippet(publishedAt,title,description,categoryId,tags),'
+            'contentDetails(duration,caption),'
+            'statistics(viewCount,likeCount,commentCount))'
+        ),
+    }
+    # Infer the shape of every fetch's upstream video items on a background
+    # ShapeInferencer (debug_shape=True does it for one call); sample_size
+    # caps the items examined, baseline is a saved shape file to diff against
+    shape_debug = False
+    shape_sample_size = None
+    shape_baseline = None
+    shape_outfile = 'response_shape_debug.json'
 
     @staticmethod
     def store_key_from_env():
@@ -18,32 +184,180 @@ class Requester:
         Requester.api_key = os.getenv('KEY', '')
 
     @staticmethod
+    @timed('resolve_channel')
     def resolve_channel_id(channel_or_handle: str) -> str:
         """Return a channelId for either a raw channelId or a YouTube @handle.
         If resolution fails, return the original input.
         """
         if isinstance(channel_or_handle, str) and channel_or_handle.startswith('@'):
+            directory = Requester.channel_directory
+            if directory is not None:
+                channel_id = directory.channel_for_handle(channel_or_handle)
+                if channel_id:
+                    return channel_id
             handle = channel_or_handle.lstrip('@')
             data = Requester.request_json(
                 f"{Requester.API_BASE}/channels",
                 {
-                    "part": "id",
+                    # contentDetails too, so the directory learns the uploads playlist for free
+                    "part": "id,contentDetails" if directory is not None else "id",
                     "forHandle": handle,
                     "key": Requester.api_key,
                 },
             )
             try:
-                return data['items'][0]['id']
+                channel_id = data['items'][0]['id']
             except (KeyError, IndexError):
                 return channel_or_handle
+            if directory is not None:
+                directory.add_handle(channel_or_handle, channel_id)
+                directory.add_channels(Requester._uploads_by_channel(data))
+            return channel_id
         return channel_or_handle
 
+    @staticmethod
+    def _uploads_by_channel(ch_data) -> dict:
+        """{channelId: uploads playlist ID} from a channels.list response."""
+        uploads = {}
+        for item in ch_data.get('items', []):
+            playlist_id = item.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+            if item.get('id') and playlist_id:
+                uploads[item['id']] = playlist_id
+        return uploads
+
+    @staticmethod
+    def resolve_channels(channels_or_handles) -> dict:
+        """Resolve many channel IDs / @handles to {input: (channelId, uploads playlist ID)}.
+
+        Directory hits cost nothing; unknown channel IDs are packed 50 per
+        `channels` call, and each unknown handle takes one forHandle call
+        (which also yields its uploads playlist). Unresolvable inputs map to
+        (input or channelId, None).
+        """
+        directory = Requester.channel_directory
+        channel_ids = {c: Requester.resolve_channel_id(c) for c in dict.fromkeys(channels_or_handles)}
+        wanted = list(dict.fromkeys(channel_ids.values()))
+        uploads = directory.uploads_for_channels(wanted) if directory is not None else {}
+        missing = [c for c in wanted if c not in uploads]
+        for i in range(0, len(missing), 50):
+            ch_data = Requester.request_json(
+                f"{Requester.API_BASE}/channels",
+                {
+                    "part": "contentDetails",
+                    "id": ",".join(missing[i:i + 50]),
+                    "maxResults": 50,
+                    "key": Requester.api_key,
+                },
+            )
+            found = Requester._uploads_by_channel(ch_data)
+            if directory is not None:
+                directory.add_channels(found)
+            uploads.update(found)
+        return {c: (cid, uploads.get(cid)) for c, cid in channel_ids.items()}
+
+    @staticmethod
+    def get_session():
+        """Return the shared pooled session, sized for max_workers connections."""
+        if Requester.session is None:
+            session = requests.Session()
+            pool_size = max(10, Requester.max_workers)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            Requester.session = session
+        return Requester.session
+
+    @staticmethod
+    @contextmanager
+    def track_quota():
+        """Collect quota spent by calls made in this context (and its detail workers)."""
+        ledger = QuotaLedger()
+        token = Requester._quota_ledger.set(ledger)
+        try:
+            yield ledger
+        finally:
+            Requester._quota_ledger.reset(token)
+
+    @staticmethod
+    def _is_transient(resp) -> bool:
+        if resp.status_code in (429, 500, 502, 503, 504):
+            return True
+        if resp.status_code == 403:
+            # Per-user/per-minute rate limits clear up; daily quotaExceeded does not
+            try:
+                errors = resp.json().get('error', {}).get('errors', [])
+            except ValueError:
+                return False
+            return any(e.get('reason') in ('rateLimitExceeded', 'userRateLimitExceeded') for e in errors)
+        return False
+
+    @staticmethod
+    def _backoff_delay(attempt: int, resp=None) -> float:
+        retry_after = resp.headers.get('Retry-After') if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), Requester.backoff_max)
+        # Full jitter: uniform over the exponential window
+        return random.uniform(0, min(Requester.backoff_max, Requester.backoff_base * 2 ** attempt))
+
     @staticmethod
     def request_json(url: str, params: dict, timeout: int = 10):
-        """Perform a GET request and return parsed JSON with status checks."""
-        resp = requests.get(url, params=params, timeout=timeout)
-        resp.raise_for_status()
-        return resp.json()
+        """Perform a GET request and return parsed JSON with status checks.
+
+        Endpoints in FIELD_MASKS get a `fields=` partial-response mask unless
+        use_field_masks is off. Each attempt waits on Requester.limiter for
+        the endpoint's quota cost and is charged, with its response bytes, to
+        the active track_quota() ledger and to the process-wide metrics.
+        Transient failures are retried with jittered exponential backoff, so a
+        paginated caller resumes from the same pageToken instead of starting
+        over. With an etag_cache, requests seen before are sent with
+        If-None-Match and a 304 returns the cached body.
+        """
+        endpoint = url.rstrip('/').rsplit('/', 1)[-1]
+        cost = Requester.QUOTA_COSTS.get(endpoint, 1)
+        if Requester.use_field_masks and endpoint in Requester.FIELD_MASKS and 'fields' not in params:
+            params = {**params, 'fields': Requester.FIELD_MASKS[endpoint]}
+        ledger = Requester._quota_ledger.get()
+        etag_cache = Requester.etag_cache
+        cache_key = cached = None
+        headers = {}
+        if etag_cache is not None:
+            cache_key = (url, tuple(sorted((k, str(v)) for k, v in params.items() if k != 'key')))
+            cached = etag_cache.get(cache_key)
+            if cached is not None:
+                headers['If-None-Match'] = cached[0]
+        for attempt in range(Requester.max_retries + 1):
+            if Requester.limiter is not None:
+                Requester.limiter.acquire(cost)
+            if ledger is not None:
+                ledger.record(endpoint, cost, retry=attempt > 0)
+            last_try = attempt == Requester.max_retries
+            started = time.perf_counter()
+            try:
+                resp = Requester.get_session().get(url, params=params, headers=headers, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                record_upstream(endpoint, 'error', cost, 0, time.perf_counter() - started, retry=attempt > 0)
+                if last_try:
+                    raise
+                time.sleep(Requester._backoff_delay(attempt))
+                continue
+            record_upstream(
+                endpoint, resp.status_code, cost, len(resp.content), time.perf_counter() - started, retry=attempt > 0
+            )
+            if not last_try and Requester._is_transient(resp):
+                time.sleep(Requester._backoff_delay(attempt, resp))
+                continue
+            if resp.status_code == 304 and cached is not None:
+                if ledger is not None:
+                    ledger.record_not_modified()
+                etag_cache.put(cache_key, cached)  # refresh its LRU position and TTL
+                return json.loads(cached[1])
+            resp.raise_for_status()
+            if ledger is not None:
+                ledger.record_bytes(endpoint, len(resp.content))
+            etag = resp.headers.get('ETag')
+            if cache_key is not None and etag:
+                etag_cache.put(cache_key, (etag, resp.content))
+            return resp.json()
 
     @staticmethod
     def get_channel_details(channel_id: str):
@@ -58,8 +372,14 @@ class Requester:
         )
 
     @staticmethod
+    @timed('uploads_playlist')
     def get_uploads_playlist_id(channel_id: str):
         """Return the uploads playlist ID for a given channel, or None if unavailable."""
+        directory = Requester.channel_directory
+        if directory is not None:
+            uploads_playlist_id = directory.uploads_for_channel(channel_id)
+            if uploads_playlist_id:
+                return uploads_playlist_id
         ch_data = Requester.get_channel_details(channel_id)
         ch_items = ch_data.get('items', [])
         if not ch_items:
@@ -70,301 +390,684 @@ class Requester:
             .get('relatedPlaylists', {})
             .get('uploads')
         )
+        if directory is not None and uploads_playlist_id:
+            directory.add_channels({channel_id: uploads_playlist_id})
         return uploads_playlist_id
 
     @staticmethod
-    def get_all_video_ids(playlist_id: str):
-        """Return all video IDs from a given playlist via paginated playlistItems requests."""
-        video_ids = []
+    def iter_video_id_pages(playlist_id: str, stop_at_ids=None):
+        """Yield one list of video IDs per playlistItems page, as each page arrives.
+
+        If stop_at_ids is given, paging stops at the first videoId already in
+        that set (uploads playlists are newest first, so everything after it
+        is already known).
+        """
         pl_params = {
-            "part": "snippet,contentDetails",
+            "part": "contentDetails",
             "playlistId": playlist_id,
             "maxResults": 50,
             "key": Requester.api_key,
         }
         while True:
-            pl_data = Requester.request_json(
-                f"{Requester.API_BASE}/playlistItems",
-                pl_params,
-            )
+            with stage('pagination'):
+                pl_data = Requester.request_json(
+                    f"{Requester.API_BASE}/playlistItems",
+                    pl_params,
+                )
+            page_ids = []
             for item in pl_data.get('items', []):
                 vid = item.get('contentDetails', {}).get('videoId')
+                if stop_at_ids and vid in stop_at_ids:
+                    if page_ids:
+                        yield page_ids
+                    return
                 if vid:
-                    video_ids.append(vid)
+                    page_ids.append(vid)
+            if page_ids:
+                yield page_ids
             token = pl_data.get('nextPageToken')
             if not token:
                 break
             pl_params["pageToken"] = token
+
+    @staticmethod
+    def get_all_video_ids(playlist_id: str, stop_at_ids=None):
+        """Return all video IDs from a given playlist via paginated playlistItems requests."""
+        video_ids = []
+        for page_ids in Requester.iter_video_id_pages(playlist_id, stop_at_ids):
+            video_ids.extend(page_ids)
         return video_ids
 
     @staticmethod
-    def get_video_details(video_ids):
-        """Fetch detailed video data for a list of video IDs (chunks of 50)."""
+    @timed('video_details')
+    def get_video_chunk(chunk):
+        """Fetch detailed video data for up to 50 video IDs in one request."""
+        v_data = Requester.request_json(
+            f"{Requester.API_BASE}/videos",
+            {
+                "part": "snippet,contentDetails,statistics",
+                "id": ",".join(chunk),
+                "key": Requester.api_key,
+            },
+        )
+        return v_data.get('items', [])
+
+    @staticmethod
+    def iter_video_detail_chunks(id_pages, max_workers=None):
+        """Yield video detail items per 50-ID batch while id_pages is still being consumed.
+
+        id_pages is any iterable of ID lists (e.g. iter_video_id_pages); IDs are
+        re-batched to 50 and each full batch is submitted as soon as it forms,
+        so detail fetching overlaps pagination. Chunks are yielded in input
+        order, on up to max_workers threads (default Requester.max_workers).
+        """
+        workers = Requester.max_workers if max_workers is None else max_workers
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for batch in Requester._iter_id_batches(id_pages):
+                # Run in a copy of the caller's context so quota tracking follows
+                ctx = contextvars.copy_context()
+                pending.append(pool.submit(ctx.run, Requester.get_video_chunk, batch))
+                # Hand back whatever has finished in order, without blocking paging
+                while pending and pending[0].done():
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    @staticmethod
+    def _iter_id_batches(id_pages, size: int = 50):
+        batch = []
+        for page_ids in id_pages:
+            batch.extend(page_ids)
+            while len(batch) >= size:
+                yield batch[:size]
+                batch = batch[size:]
+        if batch:
+            yield batch
+
+    @staticmethod
+    def get_video_details(video_ids, max_workers=None):
+        """Fetch detailed video data for a list of video IDs (chunks of 50).
+
+        Chunks are fetched concurrently on up to max_workers threads
+        (default Requester.max_workers); output keeps the input order.
+        """
         all_video_data = []
-        for i in range(0, len(video_ids), 50):
-            chunk = video_ids[i:i+50]
-            v_data = Requester.request_json(
-                f"{Requester.API_BASE}/videos",
-                {
-                    "part": "snippet,contentDetails,statistics",
-                    "id": ",".join(chunk),
-                    "key": Requester.api_key,
-                },
-            )
-            all_video_data.extend(v_data.get('items', []))
+        for items in Requester.iter_video_detail_chunks([video_ids], max_workers):
+            all_video_data.extend(items)
         return all_video_data
-    
+
+    @staticmethod
+    def get_playlist_videos(playlist_id: str, stop_at_ids=None, max_workers=None, on_chunk=None):
+        """Page a playlist and fetch its video details as one pipelined stream.
+
+        on_chunk(items), if given, is called with each videos.list chunk as
+        soon as it is available, in playlist order.
+        """
+        all_video_data = []
+        id_pages = Requester.iter_video_id_pages(playlist_id, stop_at_ids)
+        for items in Requester.iter_video_detail_chunks(id_pages, max_workers):
+            all_video_data.extend(items)
+            if on_chunk is not None:
+                on_chunk(items)
+        return all_video_data
+
     @staticmethod
     def get_channel_videos_request(channel_or_handle, debug_shape=False):
+        """Return all video details for a channel ID or @handle ([] on errors).
+
+        Concurrent calls for the same channel, by ID or @handle, are coalesced
+        into one fetch and share its result list, which callers must treat as
+        read-only.
+        """
+        channel_id = Requester.canonical_channel_id(channel_or_handle)
+        return Requester._inflight.do(
+            ('channel_videos', channel_id, debug_shape),
+            Requester._fetch_channel_videos,
+            channel_id,
+            debug_shape,
+        )
+
+    @staticmethod
+    def canonical_channel_id(channel_or_handle):
+        """Resolve a @handle (itself coalesced) so fetches single-flight on the channel ID.
+
+        Falls back to the raw input when it can't be resolved; the fetch then
+        fails or resolves it the same way it always has.
+        """
+        if not (isinstance(channel_or_handle, str) and channel_or_handle.startswith('@')):
+            return channel_or_handle
+        if not Requester.api_key:
+            try:
+                Requester.store_key_from_env()
+            except Exception:
+                return channel_or_handle
+        try:
+            return Requester._inflight.do(
+                ('resolve_channel', channel_or_handle), Requester.resolve_channel_id, channel_or_handle
+            )
+        except requests.RequestException:
+            return channel_or_handle
+
+    @staticmethod
+    def _channel_uploads(channel_or_handle):
+        """Return (channel_id, uploads playlist ID); (None, None) without an API key."""
         # Ensure we have an API key available for testing
         if not Requester.api_key:
             try:
                 Requester.store_key_from_env()
             except Exception:
-                return []
+                return None, None
+        # Resolve handle to channel ID if needed
+        channel_id = Requester.resolve_channel_id(channel_or_handle)
+        return channel_id, Requester.get_uploads_playlist_id(channel_id)
+
+    @staticmethod
+    def get_channel_video_columns(channel_or_handle):
+        """Memory-lean get_channel_videos_request: a VideoColumns (empty on errors).
+
+        Detail chunks are parsed into typed arrays as they arrive and their raw
+        JSON dropped; with a video_store, each chunk is also written to the
+        store as it arrives, and stored videos that need no refresh are read
+        back in batches, so the channel is never held as one list. Concurrent calls for the same channel,
+        by ID or @handle, are coalesced.
+        """
+        channel_id = Requester.canonical_channel_id(channel_or_handle)
+        return Requester._inflight.do(
+            ('channel_columns', channel_id),
+            Requester._fetch_channel_columns,
+            channel_id,
+        )
+
+    @staticmethod
+    @timed('upstream_fetch')
+    def _fetch_channel_columns(channel_or_handle):
+        columns = VideoColumns()
+        try:
+            channel_id, uploads_playlist_id = Requester._channel_uploads(channel_or_handle)
+            if not uploads_playlist_id:
+                return columns
+            store = Requester.video_store
+            if store is not None:
+                # Same incremental refresh as _fetch_channel_videos, parsing chunks on the way into the store
+                Requester._refresh_stored_channel(
+                    channel_id, uploads_playlist_id, on_chunk=columns.append, on_stored=columns.append
+                )
+                columns.sort_newest_first()  # stored rows may precede new uploads
+            else:
+                id_pages = Requester.iter_video_id_pages(uploads_playlist_id)
+                for items in Requester.iter_video_detail_chunks(id_pages):
+                    columns.append(items)
+            return columns
+        except requests.RequestException:
+            return VideoColumns()
+
+    @staticmethod
+    def _refresh_stored_channel(channel_id, uploads_playlist_id, on_chunk=None, on_stored=None):
+        """Bring a channel in video_store up to date.
+
+        Uploads are paged only until the first stored videoId. If the stored
+        statistics are older than stats_ttl, every stored video is re-pulled
+        from videos.list (1 unit per 50 IDs) and upserted; stored videos it
+        no longer returns (deleted or private) are dropped. on_chunk(items)
+        gets each upstream chunk; on_stored(items), if given, gets stored
+        videos that were fresh enough not to be re-pulled, in batches of
+        stream_batch_size. Returns whether on_chunk saw every video of the
+        channel (nothing stored, or all stored videos re-pulled).
+        """
+        store = Requester.video_store
+        stored_ids = store.video_ids(channel_id)
+        refreshed_at = store.refreshed_at(channel_id)
+        started = time.time()
+        stats_due = refreshed_at is None or started - refreshed_at >= Requester.stats_ttl
+        if stored_ids and not stats_due and on_stored is not None:
+            # Fresh enough; no network wait, and never the whole channel in one batch
+            for batch in store.iter_videos(channel_id, Requester.stream_batch_size):
+                on_stored(batch)
+
+        pending = []
+
+        def upsert(items):
+            pending.extend(items)
+            if len(pending) >= Requester.store_write_batch:
+                store.add_videos(channel_id, pending)
+                pending.clear()
+            if on_chunk is not None:
+                on_chunk(items)
+
+        new_ids = []
+        try:
+            id_pages = Requester.iter_video_id_pages(uploads_playlist_id, stop_at_ids=set(stored_ids))
+            for items in Requester.iter_video_detail_chunks(id_pages):
+                new_ids.extend(v.get('id') for v in items)
+                upsert(items)
+            store.add_videos(channel_id, pending)
+            pending.clear()
+        except BaseException:
+            # Paging stops at the newest stored video, so a partial write would leave a permanent gap
+            store.remove_videos(channel_id, new_ids)
+            raise
+        if stored_ids and stats_due:
+            returned = set()
+            for items in Requester.iter_video_detail_chunks([stored_ids]):
+                upsert(items)
+                returned.update(v.get('id') for v in items)
+            store.add_videos(channel_id, pending)
+            store.remove_videos(channel_id, [vid for vid in stored_ids if vid not in returned])
+        if stats_due:
+            store.mark_refreshed(channel_id, started)
+        return stats_due or not stored_ids
+
+    @staticmethod
+    def stream_channel_videos(channel_or_handle, on_chunk):
+        """Like get_channel_videos_request, calling on_chunk(items) with each batch
+        as it arrives so callers can show results before the fetch completes.
+
+        Not coalesced: concurrent followers could not replay the chunks.
+        """
+        return Requester._fetch_channel_videos(channel_or_handle, on_chunk=on_chunk)
 
+    @staticmethod
+    @timed('upstream_fetch')
+    def _fetch_channel_videos(channel_or_handle, debug_shape=False, on_chunk=None):
+        # on_chunk(items) receives batches as they become available (see
+        # stream_channel_videos); the return value is the same either way.
+        inferencer = None
+        upstream_chunk = on_chunk
+        if debug_shape or Requester.shape_debug:
+            # Shape of what the API returned this time; merged off the request thread
+            inferencer = ShapeInferencer(
+                outfile=Requester.shape_outfile,
+                sample_size=Requester.shape_sample_size,
+                baseline=Requester.shape_baseline,
+            ).start()
+            if on_chunk is None:
+                upstream_chunk = inferencer.feed
+            else:
+                def upstream_chunk(items):
+                    on_chunk(items)
+                    inferencer.feed(items)
+        complete = False  # whether the inferencer saw the whole channel
         try:
-            # Resolve handle to channel ID if needed
-            channel_id = Requester.resolve_channel_id(channel_or_handle)
-            # Get uploads playlist ID
-            uploads_playlist_id = Requester.get_uploads_playlist_id(channel_id)
+            channel_id, uploads_playlist_id = Requester._channel_uploads(channel_or_handle)
             if not uploads_playlist_id:
                 return []
 
-            # Get all video IDs from the uploads playlist
-            video_ids = Requester.get_all_video_ids(uploads_playlist_id)
-            # Fetch detailed video data for those IDs
-            all_video_data = Requester.get_video_details(video_ids)
-            if debug_shape:
-                DebugTools.create_response_shape_debug_example(all_video_data)
+            store = Requester.video_store
+            if store is not None:
+                # Incremental refresh: new uploads plus, when due, fresh stats for stored ones
+                complete = Requester._refresh_stored_channel(
+                    channel_id, uploads_playlist_id, on_chunk=upstream_chunk, on_stored=on_chunk
+                )
+                all_video_data = store.get_videos(channel_id)
+            else:
+                # Page the uploads playlist and fetch details as each page arrives
+                all_video_data = Requester.get_playlist_videos(uploads_playlist_id, on_chunk=upstream_chunk)
+                complete = True
             return all_video_data
         except requests.RequestException:
             # On network/API errors, return an empty list for testing simplicity
             return []
+        finally:
+            if inferencer is not None:
+                inferencer.close(complete=complete)
     
 class DebugTools:
     @staticmethod
-    def create_response_shape_debug_example(data, outfile='response_shape_debug.json'):
-        # Produce a readable "shape" summary of nested JSON data.
-        def type_name(v):
-            if v is None:
-                return 'null'
-            if isinstance(v, bool):
-                return 'bool'
-            if isinstance(v, int):
-                return 'int'
-            if isinstance(v, float):
-                return 'float'
-            if isinstance(v, str):
-                return 'str'
-            if isinstance(v, list):
-                return 'list'
-            if isinstance(v, dict):
-                return 'dict'
-            return type(v).__name__
-
-        def merge_shapes(a, b):
-            if a is None:
-                return b
-            if b is None:
+    def type_name(v):
+        if v is None:
+            return 'null'
+        if isinstance(v, bool):
+            return 'bool'
+        if isinstance(v, int):
+            return 'int'
+        if isinstance(v, float):
+            return 'float'
+        if isinstance(v, str):
+            return 'str'
+        if isinstance(v, list):
+            return 'list'
+        if isinstance(v, dict):
+            return 'dict'
+        return type(v).__name__
+
+    @staticmethod
+    def merge_shapes(a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+
+        # Primitive type name unions (e.g., 'int' vs 'str')
+        if isinstance(a, str) and isinstance(b, str):
+            if a == b:
+                return a
+            return sorted(set([a, b]))
+
+        # List of primitive type names + single primitive
+        if isinstance(a, list) and all(isinstance(x, str) for x in a) and isinstance(b, str):
+            if b in a:
                 return a
+            return sorted(a + [b])
+
+        # Dict merge (used for nested object shapes and list item shapes)
+        if isinstance(a, dict) and isinstance(b, dict):
+            result = dict(a)
+            for key in set(a.keys()) | set(b.keys()):
+                result[key] = DebugTools.merge_shapes(a.get(key), b.get(key))
+            return result
+
+        # Mixed shapes (e.g., dict vs primitive): represent as anyOf
+        def to_anyof(x):
+            if isinstance(x, dict) and 'anyOf' in x and isinstance(x['anyOf'], list):
+                return x['anyOf']
+            return [x]
+
+        anyof = to_anyof(a) + to_anyof(b)
+        # Deduplicate primitive entries
+        prims = set()
+        deduped = []
+        for x in anyof:
+            if isinstance(x, str):
+                if x in prims:
+                    continue
+                prims.add(x)
+                deduped.append(x)
+            else:
+                deduped.append(x)
+        return {'anyOf': deduped}
+
+    @staticmethod
+    def shape_of(v):
+        if isinstance(v, dict):
+            result = {}
+            for k, val in v.items():
+                result[k] = DebugTools.merge_shapes(result.get(k), DebugTools.shape_of(val))
+            return result
+        if isinstance(v, list):
+            item_shape = None
+            for item in v:
+                item_shape = DebugTools.merge_shapes(item_shape, DebugTools.shape_of(item))
+            if item_shape is None:
+                item_shape = 'empty'
+            return {'list_item': item_shape}
+        return DebugTools.type_name(v)
+
+    @staticmethod
+    def absorb_shape(shape, value):
+        """merge_shapes(shape, shape_of(value)), but updating dict shapes in place
+        so each item costs only a walk over its own fields.
+        """
+        if isinstance(value, (dict, list)) and (shape is None or isinstance(shape, dict)):
+            if shape is None:
+                shape = {}
+            if isinstance(value, dict):
+                for k, val in value.items():
+                    shape[k] = DebugTools.absorb_shape(shape.get(k), val)
+            elif not value:
+                shape['list_item'] = DebugTools.merge_shapes(shape.get('list_item'), 'empty')
+            else:
+                for item in value:
+                    shape['list_item'] = DebugTools.absorb_shape(shape.get('list_item'), item)
+            return shape
+        return DebugTools.merge_shapes(shape, DebugTools.shape_of(value))
 
-            # Primitive type name unions (e.g., 'int' vs 'str')
-            if isinstance(a, str) and isinstance(b, str):
-                if a == b:
-                    return a
-                return sorted(set([a, b]))
-
-            # List of primitive type names + single primitive
-            if isinstance(a, list) and all(isinstance(x, str) for x in a) and isinstance(b, str):
-                if b in a:
-                    return a
-                return sorted(a + [b])
-
-            # Dict merge (used for nested object shapes and list item shapes)
-            if isinstance(a, dict) and isinstance(b, dict):
-                result = dict(a)
-                for key in set(a.keys()) | set(b.keys()):
-                    result[key] = merge_shapes(a.get(key), b.get(key))
-                return result
-
-            # Mixed shapes (e.g., dict vs primitive): represent as anyOf
-            def to_anyof(x):
-                if isinstance(x, dict) and 'anyOf' in x and isinstance(x['anyOf'], list):
-                    return x['anyOf']
-                return [x]
-
-            anyof = to_anyof(a) + to_anyof(b)
-            # Deduplicate primitive entries
-            prims = set()
-            deduped = []
-            for x in anyof:
-                if isinstance(x, str):
-                    if x in prims:
-                        continue
-                    prims.add(x)
-                    deduped.append(x)
+    @staticmethod
+    def shape_paths(shape, prefix: str = '') -> dict:
+        """Flatten a shape tree to {path: type signature}; list items add '[]'."""
+        if isinstance(shape, dict) and 'anyOf' not in shape and shape:
+            paths = {}
+            for key, sub in shape.items():
+                if key == 'list_item':
+                    path = f"{prefix}[]"
                 else:
-                    deduped.append(x)
-            return {'anyOf': deduped}
-
-        def shape_of(v):
-            if isinstance(v, dict):
-                result = {}
-                for k, val in v.items():
-                    result[k] = merge_shapes(result.get(k), shape_of(val))
-                return result
-            if isinstance(v, list):
-                item_shape = None
-                for item in v:
-                    item_shape = merge_shapes(item_shape, shape_of(item))
-                if item_shape is None:
-                    item_shape = 'empty'
-                return {'list_item': item_shape}
-            return type_name(v)
-
-        shape = shape_of(data)
+                    path = f"{prefix}.{key}" if prefix else key
+                paths.update(DebugTools.shape_paths(sub, path))
+            return paths
+        if isinstance(shape, list):
+            return {prefix: '|'.join(shape)}
+        if isinstance(shape, str):
+            return {prefix: shape}
+        return {prefix: json.dumps(shape, sort_keys=True)}  # anyOf / empty object
+
+    @staticmethod
+    def shape_drift(baseline, current) -> dict:
+        """Paths added, removed and changed in type between two shape trees."""
+        old = DebugTools.shape_paths(baseline)
+        new = DebugTools.shape_paths(current)
+        return {
+            'added': sorted(new.keys() - old.keys()),
+            'removed': sorted(old.keys() - new.keys()),
+            'changed': {p: [old[p], new[p]] for p in sorted(old.keys() & new.keys()) if old[p] != new[p]},
+        }
+
+    @staticmethod
+    def create_response_shape_debug_example(data, outfile='response_shape_debug.json'):
+        # Produce a readable "shape" summary of nested JSON data.
+        shape = DebugTools.shape_of(data)
         with open(outfile, 'w', encoding='utf-8') as f:
             json.dump(shape, f, indent=2, ensure_ascii=False)
 
+class ShapeInferencer:
+    """Streaming, off-request-path create_response_shape_debug_example.
+
+    feed(items) only enqueues; a background thread merges items into one
+    shape tree in place (or, with `sample_size`, keeps a reservoir sample
+    of that many items and infers from it at the end). close() lets the
+    thread finish: it writes the shape to `outfile` and, given a `baseline`
+    shape file, logs and records (in `drift`) how the schema moved.
+
+    Only a complete fetch (close(complete=True), every item absorbed with no
+    sampling) says which paths are gone: it replaces `outfile` and is
+    diffed as is. Anything less, e.g. a few new uploads or a reservoir
+    sample that lacks an optional field, is merged into the previous
+    `outfile` and into the baseline before diffing, so it can only report
+    added paths and new types.
+    """
+
+    def __init__(self, outfile: str = 'response_shape_debug.json', sample_size: int | None = None,
+                 baseline: str | None = None, seed=None):
+        self.outfile = outfile
+        self.sample_size = sample_size
+        self.baseline = baseline
+        self.seen = 0
+        self.item_shape = None
+        self.drift = None
+        self.complete = False
+        self._reservoir = []
+        self._rng = random.Random(seed)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='shape-inferencer', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def feed(self, items):
+        self._queue.put(items)
+
+    def close(self, complete: bool = False):
+        """Finish; `complete` means the fed items were the whole response, not a subset."""
+        self.complete = complete
+        self._queue.put(None)
+
+    def join(self, timeout: float | None = None):
+        self._thread.join(timeout)
+        return self
+
+    @property
+    def shape(self):
+        """Shape of the whole response list, as create_response_shape_debug_example writes it."""
+        return {'list_item': self.item_shape if self.item_shape is not None else 'empty'}
+
+    def _add(self, item):
+        self.seen += 1
+        if self.sample_size is None:
+            self.item_shape = DebugTools.absorb_shape(self.item_shape, item)
+        elif len(self._reservoir) < self.sample_size:
+            self._reservoir.append(item)
+        else:
+            # Algorithm R: item i replaces a random slot with probability k / i
+            j = self._rng.randrange(self.seen)
+            if j < self.sample_size:
+                self._reservoir[j] = item
+
+    def _run(self):
+        while (items := self._queue.get()) is not None:
+            for item in items:
+                self._add(item)
+        try:
+            self._finish()
+        except Exception:
+            logger.exception("Shape inference failed")
+
+    def _finish(self):
+        for item in self._reservoir:
+            self.item_shape = DebugTools.absorb_shape(self.item_shape, item)
+        self._reservoir = []
+        if not self.seen:
+            return  # nothing fetched upstream; keep the previous shape file
+        covered = self.complete and (self.sample_size is None or self.seen <= self.sample_size)
+        shape = self.shape
+        if not covered:
+            shape = DebugTools.merge_shapes(self._load_shape(self.outfile), shape)
+        with open(self.outfile, 'w', encoding='utf-8') as f:
+            json.dump(shape, f, indent=2, ensure_ascii=False)
+        if self.baseline:
+            baseline = self._load_shape(self.baseline)
+            if baseline is None:
+                raise OSError(f"Cannot read shape baseline {self.baseline}")
+            current = shape if covered else DebugTools.merge_shapes(baseline, shape)
+            self.drift = DebugTools.shape_drift(baseline, current)
+            for kind in ('added', 'removed', 'changed'):
+                if self.drift[kind]:
+                    SCHEMA_DRIFT_PATHS.inc(len(self.drift[kind]), kind=kind)
+            if any(self.drift.values()):
+                logger.warning("Response schema drifted from %s: %s", self.baseline, json.dumps(self.drift))
+
+    @staticmethod
+    def _load_shape(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
 class Formatter:
+    # Bump whenever videos_to_dataframe's features change, to invalidate stored features
+    FEATURE_SCHEMA_VERSION = 2
+    # Matches PT#H#M#S and P#DT#H#M#S (any subset of components)
+    DURATION_PATTERN = r"^P(?:(\d+)D)?T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?\Z"
+
+    @staticmethod
+    def iso8601_durations_to_seconds(durations: pd.Series) -> pd.Series:
+        """Convert ISO 8601 durations to whole seconds in one vectorized pass.
+
+        Missing or unparseable values become 0.
+        """
+        parts = (
+            pd.Series(durations, dtype=object)
+            .str.extract(Formatter.DURATION_PATTERN)
+            .astype('float64')
+            .fillna(0)
+        )
+        seconds = parts[0] * 86400 + parts[1] * 3600 + parts[2] * 60 + parts[3]
+        return seconds.astype('Int64')
+
     @staticmethod
+    @timed('videos_to_dataframe')
     def videos_to_dataframe(videos_json):
-        rows = []
-        for video in videos_json:
-            snippet = video.get('snippet', {})
-            statistics = video.get('statistics', {})
-            content_details = video.get('contentDetails', {})
+        # Pull raw fields straight into columns (one pass per field, no row dicts)
+        snippets = [video.get('snippet', {}) for video in videos_json]
+        statistics = [video.get('statistics', {}) for video in videos_json]
+        content_details = [video.get('contentDetails', {}) for video in videos_json]
+        caption_raw = [c.get('caption') for c in content_details]  # 'true'/'false' or missing
 
-            # Raw fields
-            published_at = snippet.get('publishedAt')
-            duration_iso = content_details.get('duration')
-            caption_raw = content_details.get('caption')  # 'true'/'false' or missing
-            category_id = snippet.get('categoryId')
-            tags = snippet.get('tags') or []
-
-            row = {
-                'videoId': video.get('id'),
-                'title': snippet.get('title'),
-                'publishedAt': published_at,
-                'description': snippet.get('description'),
-                'viewCount': int(statistics.get('viewCount', 0) or 0),
-                'likeCount': int(statistics.get('likeCount', 0) or 0),
-                'commentCount': int(statistics.get('commentCount', 0) or 0),
-                'duration': duration_iso,
-                'categoryId': category_id,
-                'hasCaptionsRaw': caption_raw,
-                'numTags': len(tags),
-                'titleLength': len(snippet.get('title') or ''),
-                'descriptionLength': len(snippet.get('description') or ''),
-            }
-            rows.append(row)
-
-        df = pd.DataFrame(rows)
-
-        # Parse publishedAt to timezone-aware datetime (UTC) and epoch seconds
-        if 'publishedAt' in df.columns:
-            df['publishedAt_dt'] = pd.to_datetime(df['publishedAt'], utc=True, errors='coerce')
-            # Unix timestamp seconds using Timestamp.timestamp() which handles tz-aware
-            df['publishedTimestamp'] = (
-                df['publishedAt_dt'].apply(lambda x: int(x.timestamp()) if pd.notnull(x) else pd.NA)
-            ).astype('Int64')
-
-            # Derived time-based features
-            if df['publishedAt_dt'].notna().any():
-                min_dt = df['publishedAt_dt'].min(skipna=True)
-                max_dt = df['publishedAt_dt'].max(skipna=True)
-
-                # Days since first upload (channel sequence index in days)
-                ds_orig_secs = (df['publishedAt_dt'] - min_dt).astype('timedelta64[s]')
-                ds_orig_days = ds_orig_secs / (24 * 3600)
-                df['daysSinceOrigination'] = (
-                    pd.to_numeric(ds_orig_days, errors='coerce')
-                    .round()
-                    .fillna(0)
-                    .astype('Int64')
-                )
+        # hasCaptions -> binary int 0/1 from contentDetails.caption ('true'/'false')
+        captions = pd.Series(caption_raw, dtype=object)
+        is_true_str = captions.str.strip().str.lower().isin(['true', '1', 'yes'])
+        is_true_bool = np.fromiter((c is True for c in caption_raw), dtype=bool, count=len(caption_raw))
 
-                # Cadence: days since previous upload (chronological diff)
-                df_sorted = df.sort_values('publishedAt_dt')
-                diffs = df_sorted['publishedAt_dt'].diff()
-                diffs_secs = diffs.astype('timedelta64[s]')
-                diffs_days_num = diffs_secs / (24 * 3600)
-                diffs_days_num = (
-                    pd.to_numeric(diffs_days_num, errors='coerce')
-                    .round()
-                    .fillna(0)
-                    .astype('Int64')
-                )
-                # Map back to original order
-                df.loc[df_sorted.index, 'daysSinceLastVideo'] = diffs_days_num
+        return Formatter.features_from_columns({
+            'publishedAt': pd.to_datetime(
+                pd.Series([s.get('publishedAt') for s in snippets], dtype=object), utc=True, errors='coerce'
+            ),
+            'viewCount': [int(s.get('viewCount', 0) or 0) for s in statistics],
+            'likeCount': [int(s.get('likeCount', 0) or 0) for s in statistics],
+            'commentCount': [int(s.get('commentCount', 0) or 0) for s in statistics],
+            'durationSeconds': Formatter.iso8601_durations_to_seconds(
+                [c.get('duration') for c in content_details]
+            ),
+            'categoryId': [s.get('categoryId') for s in snippets],
+            'hasCaptions': (is_true_str.to_numpy(dtype=bool) | is_true_bool).astype('int64'),
+            'numTags': [len(s.get('tags') or []) for s in snippets],
+            'titleLength': [len(s.get('title') or '') for s in snippets],
+            'descriptionLength': [len(s.get('description') or '') for s in snippets],
+        })
 
-                # Use apply to avoid static analysis complaints on datetime accessors
-                df['hourOfDay'] = df['publishedAt_dt'].apply(lambda x: x.hour if pd.notnull(x) else pd.NA).astype('Int64')
-                df['dayOfWeek'] = df['publishedAt_dt'].apply(lambda x: x.dayofweek if pd.notnull(x) else pd.NA).astype('Int64')
-            else:
-                df['daysSinceOrigination'] = pd.Series([None] * len(df), dtype='Int64')
-                df['daysSinceLastVideo'] = pd.Series([None] * len(df), dtype='Int64')
-                df['hourOfDay'] = pd.Series([None] * len(df), dtype='Int64')
-                df['dayOfWeek'] = pd.Series([None] * len(df), dtype='Int64')
-
-        # ISO 8601 duration to seconds
-        def parse_iso8601_duration_to_seconds(s: str) -> int:
-            if not isinstance(s, str) or not s:
-                return 0
-            # Pattern like PT#H#M#S (any subset)
-            m = re.fullmatch(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", s)
-            if not m:
-                # Sometimes YouTube may include days: P#DT#H#M#S; handle D optionally
-                m2 = re.fullmatch(r"P(?:(\d+)D)?T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", s)
-                if not m2:
-                    return 0
-                days = int(m2.group(1) or 0)
-                hours = int(m2.group(2) or 0)
-                minutes = int(m2.group(3) or 0)
-                seconds = int(m2.group(4) or 0)
-                return days * 86400 + hours * 3600 + minutes * 60 + seconds
-            hours = int(m.group(1) or 0)
-            minutes = int(m.group(2) or 0)
-            seconds = int(m.group(3) or 0)
-            return hours * 3600 + minutes * 60 + seconds
-
-        df['durationSeconds'] = df['duration'].apply(parse_iso8601_duration_to_seconds).astype('Int64')
-
-        # has_captions -> bool derived from contentDetails.caption ('true'/'false')
-        def to_bool(x):
-            if isinstance(x, bool):
-                return x
-            if isinstance(x, str):
-                x = x.strip().lower()
-                if x in ('true', '1', 'yes'):
-                    return True
-                if x in ('false', '0', 'no'):
-                    return False
-            return None
+    @staticmethod
+    def features_from_columns(columns) -> pd.DataFrame:
+        """Build the videos_to_dataframe feature frame from per-video base columns.
+
+        `columns` maps publishedAt (UTC datetimes, NaT if missing), viewCount,
+        likeCount, commentCount, durationSeconds, categoryId (str or None), hasCaptions
+        (0/1), numTags, titleLength and descriptionLength to equal-length
+        sequences. Shared by videos_to_dataframe and VideoColumns.
+        """
+        df = pd.DataFrame({k: v for k, v in columns.items() if k != 'publishedAt'})
+        df['publishedAt_dt'] = pd.Series(columns['publishedAt'], index=df.index)
+        df['publishedTimestamp'] = (
+            (df['publishedAt_dt'] - pd.Timestamp(0, tz='UTC').as_unit(df['publishedAt_dt'].dt.unit))
+            // pd.Timedelta(seconds=1)
+        ).astype('Int64')
+
+        # Derived time-based features
+        if df['publishedAt_dt'].notna().any():
+            min_dt = df['publishedAt_dt'].min(skipna=True)
 
-        df['hasCaptions'] = df['hasCaptionsRaw'].apply(to_bool)
+            # Days since first upload (channel sequence index in days).
+            # Whole days via floor division; NaT stays NaN (and becomes 0) rather
+            # than the int64 NaT sentinel pd.to_numeric would produce.
+            df['daysSinceOrigination'] = (
+                ((df['publishedAt_dt'] - min_dt) // pd.Timedelta(days=1))
+                .fillna(0)
+                .astype('Int64')
+            )
+
+            # Cadence: days since previous upload (chronological diff)
+            df_sorted = df.sort_values('publishedAt_dt')
+            diffs = df_sorted['publishedAt_dt'].diff()
+            diffs_days_num = (
+                (diffs // pd.Timedelta(days=1))
+                .fillna(0)
+                .astype('Int64')
+            )
+            # Map back to original order
+            df.loc[df_sorted.index, 'daysSinceLastVideo'] = diffs_days_num
+
+            df['hourOfDay'] = df['publishedAt_dt'].dt.hour.astype('Int64')
+            df['dayOfWeek'] = df['publishedAt_dt'].dt.dayofweek.astype('Int64')
+        else:
+            df['daysSinceOrigination'] = pd.Series([None] * len(df), dtype='Int64')
+            df['daysSinceLastVideo'] = pd.Series([None] * len(df), dtype='Int64')
+            df['hourOfDay'] = pd.Series([None] * len(df), dtype='Int64')
+            df['dayOfWeek'] = pd.Series([None] * len(df), dtype='Int64')
 
         # category -> categoryId (one-hot encoded)
-        if 'categoryId' in df.columns:
-            # Keep raw categoryId as string for consistency
-            df['categoryId'] = df['categoryId'].astype(str)
-            cat_dummies = pd.get_dummies(df['categoryId'], prefix='cat', dtype='Int64')
-            df = pd.concat([df, cat_dummies], axis=1)
+        # Keep raw categoryId as string for consistency
+        df['categoryId'] = df['categoryId'].astype(str)
+        cat_dummies = pd.get_dummies(df['categoryId'], prefix='cat', dtype='Int64')
+        df = pd.concat([df, cat_dummies], axis=1)
 
         # dayOfWeek -> one-hot encoded (dow_0..dow_6)
-        if 'dayOfWeek' in df.columns:
-            dow_dummies = pd.get_dummies(df['dayOfWeek'], prefix='dow', dtype='Int64')
-            # Ensure consistent 7 columns even if some days are missing
-            for d in range(7):
-                col = f'dow_{d}'
-                if col not in dow_dummies.columns:
-                    dow_dummies[col] = 0
-            dow_dummies = dow_dummies[[f'dow_{d}' for d in range(7)]]
-            df = pd.concat([df, dow_dummies], axis=1)
-
-        # Convert hasCaptions to binary int 0/1
-        df['hasCaptions'] = df['hasCaptions'].map({True: 1, False: 0}).fillna(0).astype('Int64')
+        dow_dummies = pd.get_dummies(df['dayOfWeek'], prefix='dow', dtype='Int64')
+        # Ensure consistent 7 columns even if some days are missing
+        for d in range(7):
+            col = f'dow_{d}'
+            if col not in dow_dummies.columns:
+                dow_dummies[col] = 0
+        dow_dummies = dow_dummies[[f'dow_{d}' for d in range(7)]]
+        df = pd.concat([df, dow_dummies], axis=1)
 
         # Build scikit-learn ready features: numeric-only, no NaNs
         feature_cols = [
@@ -384,9 +1087,589 @@ class Formatter:
 
         return df_features
 
+    # Defaults for rolling_features: "last N videos" windows over engagement and cadence
+    ROLLING_WINDOWS = (3, 5, 10)
+    ROLLING_COLUMNS = ('viewCount', 'likeCount', 'commentCount', 'daysSinceLastVideo')
+    ROLLING_STATS = ('mean', 'sum', 'count')
+
+    @staticmethod
+    @timed('rolling_features')
+    def rolling_features(
+        df: pd.DataFrame,
+        windows=ROLLING_WINDOWS,
+        columns=ROLLING_COLUMNS,
+        stats=ROLLING_STATS,
+        time_column: str = 'publishedTimestamp',
+    ) -> pd.DataFrame:
+        """Rolling stats over each video's previous N uploads, for every window N.
+
+        The current video is excluded, so e.g. last5_mean_viewCount never
+        leaks a row's own target. Rows are ordered by time_column once and a
+        single cumulative sum serves every window and column: window sums are
+        differences of two gathered cumsum rows, so the cost is O(n) with no
+        Python loop over rows or windows. Columns are named
+        last{N}_{stat}_{column} (last{N}_count for counts).
+        """
+        windows = np.asarray(sorted(set(windows)), dtype=np.int64)
+        columns = list(columns)
+        order = np.argsort(df[time_column].to_numpy(), kind='stable')
+        values = df[columns].to_numpy(dtype='float64')[order]
+        n = len(values)
+
+        # csum[j] = sum of values[:j]
+        csum = np.zeros((n + 1, len(columns)))
+        np.cumsum(values, axis=0, out=csum[1:])
+        pos = np.arange(n)
+        window_start = np.maximum(pos[:, None] - windows[None, :], 0)
+        sums = csum[pos][:, None, :] - csum[window_start]  # rows x windows x columns
+        counts = np.minimum(pos[:, None], windows[None, :]).astype('float64')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts[..., None] > 0, sums / counts[..., None], 0.0)
+
+        out = {}
+        for wi, w in enumerate(windows):
+            if 'count' in stats:
+                out[f'last{w}_count'] = counts[:, wi]
+            for ci, col in enumerate(columns):
+                if 'mean' in stats:
+                    out[f'last{w}_mean_{col}'] = means[:, wi, ci]
+                if 'sum' in stats:
+                    out[f'last{w}_sum_{col}'] = sums[:, wi, ci]
+        return pd.DataFrame(out, index=df.index[order]).loc[df.index]
+
+    # Per-video fields available in the columnar response format
+    COLUMN_FIELDS = (
+        'videoId', 'title', 'publishedAt', 'publishedTimestamp',
+        'viewCount', 'likeCount', 'commentCount', 'durationSeconds',
+        'hourOfDay', 'dayOfWeek', 'daysSinceOrigination', 'categoryId', 'numTags',
+    )
+    DEFAULT_COLUMN_FIELDS = (
+        'videoId', 'title', 'publishedAt', 'viewCount', 'likeCount',
+        'commentCount', 'durationSeconds', 'hourOfDay', 'daysSinceOrigination',
+    )
+
+    @staticmethod
+    @timed('videos_to_columns')
+    def videos_to_columns(videos_json, fields=None) -> dict:
+        """Return {field: [values...]} for the requested COLUMN_FIELDS, one list per field.
+
+        Rows keep the input order; missing values are None. Raises ValueError
+        for unknown field names.
+        """
+        fields = list(fields or Formatter.DEFAULT_COLUMN_FIELDS)
+        unknown = [f for f in fields if f not in Formatter.COLUMN_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown column field(s): {', '.join(unknown)}")
+
+        snippets = [video.get('snippet', {}) for video in videos_json]
+        statistics = [video.get('statistics', {}) for video in videos_json]
+        content_details = [video.get('contentDetails', {}) for video in videos_json]
+        published = pd.to_datetime(
+            pd.Series([s.get('publishedAt') for s in snippets], dtype=object), utc=True, errors='coerce'
+        )
+
+        def stat(name):
+            return lambda: [int(s.get(name, 0) or 0) for s in statistics]
+
+        def days_since_origination():
+            # Whole days, matching videos_to_dataframe
+            return (published - published.min()) // pd.Timedelta(days=1)
+
+        builders = {
+            'videoId': lambda: [video.get('id') for video in videos_json],
+            'title': lambda: [s.get('title') for s in snippets],
+            'publishedAt': lambda: [s.get('publishedAt') for s in snippets],
+            'publishedTimestamp': lambda: (
+                (published - pd.Timestamp(0, tz='UTC').as_unit(published.dt.unit)) // pd.Timedelta(seconds=1)
+            ),
+            'viewCount': stat('viewCount'),
+            'likeCount': stat('likeCount'),
+            'commentCount': stat('commentCount'),
+            'durationSeconds': lambda: Formatter.iso8601_durations_to_seconds(
+                [c.get('duration') for c in content_details]
+            ),
+            'hourOfDay': lambda: published.dt.hour,
+            'dayOfWeek': lambda: published.dt.dayofweek,
+            'daysSinceOrigination': days_since_origination,
+            'categoryId': lambda: [s.get('categoryId') for s in snippets],
+            'numTags': lambda: [len(s.get('tags') or []) for s in snippets],
+        }
+
+        columns = {}
+        for field in fields:
+            values = builders[field]()
+            if isinstance(values, pd.Series):
+                # NaN/NaT -> None and numpy scalars -> Python ints for JSON
+                values = [None if pd.isna(v) else int(v) for v in values.astype('Float64')]
+            columns[field] = values
+        return columns
+
+    SERIES_METRICS = (
+        'viewCount', 'likeCount', 'commentCount', 'durationSeconds',
+        'numTags', 'hourOfDay', 'dayOfWeek', 'daysSinceOrigination',
+    )
+
+    @staticmethod
+    def lttb(x, y, threshold: int) -> np.ndarray:
+        """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+        x must be ascending. The first and last points are always kept; each
+        bucket in between keeps the point forming the largest triangle with
+        the previously kept point and the next bucket's average.
+        """
+        x = np.asarray(x, dtype='float64')
+        y = np.asarray(y, dtype='float64')
+        n = len(x)
+        if threshold >= n or n <= 2:
+            return np.arange(n)
+        threshold = max(threshold, 3)
+
+        # Bucket k covers [bounds[k], bounds[k + 1]); the last point is its own bucket
+        every = (n - 2) / (threshold - 2)
+        bounds = (np.arange(threshold) * every).astype(np.int64) + 1
+        bounds[-2:] = n - 1, n
+        # Average of the bucket after each one, from prefix sums
+        cx = np.concatenate([[0.0], np.cumsum(x)])
+        cy = np.concatenate([[0.0], np.cumsum(y)])
+        next_start, next_end = bounds[1:-1], bounds[2:]
+        avg_x = (cx[next_end] - cx[next_start]) / (next_end - next_start)
+        avg_y = (cy[next_end] - cy[next_start]) / (next_end - next_start)
+
+        kept = np.empty(threshold, dtype=np.int64)
+        kept[0], kept[-1] = 0, n - 1
+        a = 0
+        for k in range(threshold - 2):
+            lo, hi = bounds[k], bounds[k + 1]
+            # Twice the triangle area; the constant factor doesn't change the argmax
+            area = np.abs(
+                (x[a] - avg_x[k]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[k] - y[a])
+            )
+            a = lo + int(np.argmax(area))
+            kept[k + 1] = a
+        return kept
+
+    @staticmethod
+    @timed('downsample_series')
+    def downsample_series(videos_json, metric: str, points: int, start=None, end=None) -> dict:
+        """One metric over time, oldest first, LTTB-downsampled to at most `points` rows.
+
+        start/end (epoch seconds, inclusive) restrict the series to a time
+        window before downsampling, so a zoomed-in view gets full or near-full
+        resolution. `extent` is the channel's full time range either way.
+        """
+        if metric not in Formatter.SERIES_METRICS:
+            raise ValueError(f"Unknown series metric: {metric}")
+        df = pd.DataFrame(
+            Formatter.videos_to_columns(videos_json, ['videoId', 'title', 'publishedAt', 'publishedTimestamp', metric])
+        )
+        df = df[df['publishedTimestamp'].notna()].sort_values('publishedTimestamp', kind='stable')
+        ts = df['publishedTimestamp'].to_numpy(dtype='int64')
+        extent = {'start': int(ts[0]), 'end': int(ts[-1])} if len(ts) else None
+
+        window = np.ones(len(ts), dtype=bool)
+        if start is not None:
+            window &= ts >= start
+        if end is not None:
+            window &= ts <= end
+        df, ts = df[window], ts[window]
+        values = df[metric].to_numpy(dtype='int64')
+        kept = Formatter.lttb(ts, values, points)
+        df = df.iloc[kept]
+        return {
+            'metric': metric,
+            'total': len(ts),
+            'count': len(kept),
+            'downsampled': len(kept) < len(ts),
+            'extent': extent,
+            'columns': {
+                'videoId': df['videoId'].tolist(),
+                'title': df['title'].tolist(),
+                'publishedAt': df['publishedAt'].tolist(),
+                'publishedTimestamp': ts[kept].tolist(),
+                metric: values[kept].tolist(),
+            },
+        }
+
+class VideoColumns:
+    """Memory-lean ingestion: per-video base columns in preallocated typed arrays.
+
+    append() parses one videos.list chunk straight into numpy columns, keeping
+    only the lengths of title/description/tags, so each chunk's raw JSON can
+    be released as soon as it returns. to_dataframe() gives the same frame as
+    Formatter.videos_to_dataframe over all appended items.
+    """
+
+    INT_COLUMNS = {
+        'viewCount': 'int64',
+        'likeCount': 'int64',
+        'commentCount': 'int64',
+        'durationSeconds': 'int64',
+        'numTags': 'int32',
+        'titleLength': 'int32',
+        'descriptionLength': 'int32',
+        'hasCaptions': 'int8',
+        'categoryCode': 'int16',
+    }
+    _duration_re = re.compile(Formatter.DURATION_PATTERN)
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.video_ids = []
+        self.categories = []  # categoryCode -> raw categoryId (str or None)
+        self._category_codes = {}
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.INT_COLUMNS.items()}
+        self.columns['publishedAt'] = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, n: int):
+        capacity = len(self.columns['viewCount'])
+        if n <= capacity:
+            return
+        capacity = max(n, 2 * capacity)
+        for name, values in self.columns.items():
+            grown = np.zeros(capacity, dtype=values.dtype)
+            if name == 'publishedAt':
+                grown[:] = np.datetime64('NaT')
+            grown[:self.size] = values[:self.size]
+            self.columns[name] = grown
+
+    @staticmethod
+    def _duration_seconds(value) -> int:
+        m = VideoColumns._duration_re.match(value) if isinstance(value, str) else None
+        if not m:
+            return 0
+        days, hours, minutes, seconds = (int(g or 0) for g in m.groups())
+        return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+    def append(self, items):
+        """Parse a list of videos.list items into the columns."""
+        start = self.size
+        self._reserve(start + len(items))
+        cols = self.columns
+        published = []
+        for i, video in enumerate(items, start):
+            snippet = video.get('snippet', {})
+            statistics = video.get('statistics', {})
+            content_details = video.get('contentDetails', {})
+            self.video_ids.append(video.get('id'))
+            published.append(snippet.get('publishedAt'))
+            cols['viewCount'][i] = int(statistics.get('viewCount', 0) or 0)
+            cols['likeCount'][i] = int(statistics.get('likeCount', 0) or 0)
+            cols['commentCount'][i] = int(statistics.get('commentCount', 0) or 0)
+            cols['durationSeconds'][i] = self._duration_seconds(content_details.get('duration'))
+            cols['numTags'][i] = len(snippet.get('tags') or [])
+            cols['titleLength'][i] = len(snippet.get('title') or '')
+            cols['descriptionLength'][i] = len(snippet.get('description') or '')
+            caption = content_details.get('caption')
+            cols['hasCaptions'][i] = caption is True or (
+                isinstance(caption, str) and caption.strip().lower() in ('true', '1', 'yes')
+            )
+            category = snippet.get('categoryId')
+            code = self._category_codes.get(category)
+            if code is None:
+                code = self._category_codes[category] = len(self.categories)
+                self.categories.append(category)
+            cols['categoryCode'][i] = code
+        self.size = start + len(items)
+        if items:
+            parsed = pd.to_datetime(pd.Series(published, dtype=object), utc=True, errors='coerce')
+            cols['publishedAt'][start:self.size] = parsed.dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+        return self
+
+    def sort_newest_first(self):
+        """Reorder rows as VideoStore returns them: newest publishedAt first, then videoId."""
+        n = self.size
+        order = np.array(sorted(range(n), key=self.video_ids.__getitem__), dtype=np.intp)
+        published = self.columns['publishedAt'][:n][order].view('int64')
+        order = order[np.argsort(-published, kind='stable')]
+        for values in self.columns.values():
+            values[:n] = values[:n][order]
+        self.video_ids = [self.video_ids[i] for i in order]
+        return self
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Feature frame identical to Formatter.videos_to_dataframe on the same items."""
+        n = self.size
+        columns = {name: values[:n] for name, values in self.columns.items() if name != 'categoryCode'}
+        columns['publishedAt'] = pd.Series(columns['publishedAt']).dt.tz_localize('UTC')
+        categories = np.array(self.categories, dtype=object)
+        columns['categoryId'] = categories[self.columns['categoryCode'][:n]] if n else []
+        return Formatter.features_from_columns(columns)
+
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class IncrementalRegression:
+    """Standardized OLS + trend slope maintained from running sufficient statistics.
+
+    Keeps the row count, column means and centered co-moment matrix of the
+    feature frame (target included), merged batch-by-batch with the pairwise
+    update of Chan et al., so partial_fit(k rows) costs O(k*p^2) and result()
+    only solves a p x p system. result() matches StandardScaler +
+    LinearRegression fitted on all rows (no train/test split, so metrics are
+    in-sample and `mae` is unavailable) and compute_trend_slope on the
+    unscaled frame.
+    """
+
+    def __init__(self, columns, target_column: str, time_column: str = 'daysSinceOrigination'):
+        if target_column not in columns:
+            raise ValueError(f"Target column '{target_column}' not found in DataFrame")
+        self.columns = list(columns)
+        self.target_column = target_column
+        self.time_column = time_column
+        self.n = 0
+        self.mean = np.zeros(len(self.columns))
+        self.comoment = np.zeros((len(self.columns), len(self.columns)))
+        self.row_keys = set()
+
+    def partial_fit(self, df: pd.DataFrame, row_keys=None):
+        """Fold new rows (same columns) into the running statistics."""
+        X = df[self.columns].to_numpy(dtype='float64')
+        k = len(X)
+        if k == 0:
+            return self
+        batch_mean = X.mean(axis=0)
+        centered = X - batch_mean
+        n = self.n + k
+        delta = batch_mean - self.mean
+        self.comoment += centered.T @ centered + np.outer(delta, delta) * (self.n * k / n)
+        self.mean += delta * (k / n)
+        self.n = n
+        if row_keys is not None:
+            self.row_keys.update(row_keys)
+        return self
+
+    def result(self) -> dict:
+        """Return a run_linear_regression-shaped result (without 'model')."""
+        if self.n == 0:
+            raise ValueError("No rows fitted")
+        t = self.columns.index(self.target_column)
+        feats = [i for i in range(len(self.columns)) if i != t]
+        if not feats:
+            raise ValueError("No feature columns available after dropping target")
+
+        # StandardScaler: population std, zero-variance columns left unscaled
+        var = np.diag(self.comoment) / self.n
+        scale = np.sqrt(var)
+        scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+        gram = self.comoment[np.ix_(feats, feats)] / np.outer(scale[feats], scale[feats])
+        cross = self.comoment[feats, t] / (scale[feats] * scale[t])
+        coef = np.linalg.lstsq(gram, cross, rcond=None)[0]
+
+        # In-sample error from the same statistics
+        ss_tot = self.comoment[t, t] / scale[t] ** 2
+        sse = max(ss_tot - 2 * coef @ cross + coef @ gram @ coef, 0.0)
+        mse = sse / self.n
+        r2 = 1.0 - sse / ss_tot if ss_tot > 0 else (1.0 if sse == 0 else 0.0)
+
+        return {
+            'coefficients': {self.columns[i]: float(c) for i, c in zip(feats, coef)},
+            # Standardized features and target are centered, so the fit passes through 0
+            'intercept': 0.0,
+            'metrics': {'r2': float(r2), 'mae': None, 'mse': float(mse), 'rmse': float(mse ** 0.5)},
+            'n_train': int(self.n),
+            'n_test': int(self.n),
+            'trend': self.trend(),
+        }
+
+    def trend(self) -> dict | None:
+        """compute_trend_slope(target vs time_column) from the running statistics."""
+        if self.time_column not in self.columns or self.n < 2:
+            return None
+        x = self.columns.index(self.time_column)
+        y = self.columns.index(self.target_column)
+        sxx, sxy, syy = self.comoment[x, x], self.comoment[x, y], self.comoment[y, y]
+        if sxx <= 0:
+            return None
+        slope = float(sxy / sxx)
+        avg = float(self.mean[y])
+        if syy > 0:
+            r2 = float(sxy * sxy / (sxx * syy))
+        else:
+            r2 = 1.0
+        return {
+            'timeColumn': self.time_column,
+            'targetColumn': self.target_column,
+            'slope': slope,
+            'intercept': float(avg - slope * self.mean[x]),
+            'r2': r2,
+            'n': int(self.n),
+            'direction': 'up' if slope > 0 else ('down' if slope < 0 else 'flat'),
+            'avgTarget': avg,
+            'pctChangePerTimeUnit': float((slope / avg) * 100.0) if avg != 0 else None,
+        }
+
+
 class ML_Tools:
+    # Regression results keyed by (channel, target, feature fingerprint)
+    result_cache = ResultCache()
+    # (FeatureStore generation, IncrementalRegression) per (channel, target, time column), LRU-bounded
+    incremental_models = ResultCache(maxsize=128, ttl=float('inf'))
+    _incremental_lock = threading.Lock()
+    _inflight = SingleFlight()
+
+    @staticmethod
+    def worker_context():
+        """multiprocessing context for worker pools: forkserver, or spawn where unavailable.
+
+        Never plain fork: the server is multithreaded, and a child forked while
+        another thread holds a lock (e.g. a metrics histogram's) deadlocks on it.
+        """
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context('forkserver')
+            # Workers fork from a server that has already imported pandas/sklearn
+            ctx.set_forkserver_preload(['utils'])
+            return ctx
+        return multiprocessing.get_context('spawn')
+
+    @staticmethod
+    def fingerprint(df: pd.DataFrame) -> str:
+        """Cheap content hash of a feature frame (columns + every value)."""
+        h = hashlib.sha1('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return h.hexdigest()
+
+    @staticmethod
+    @timed('cached_regression')
+    def cached_regression(
+        channel_id: str,
+        features: pd.DataFrame,
+        target_column: str = 'viewCount',
+        trend_time_column: str = 'daysSinceOrigination',
+    ) -> dict:
+        """Standardize + run_linear_regression, reusing a cached result when the
+        channel's feature frame is unchanged (hits skip scaling and fitting).
+        """
+        key = (channel_id, target_column, trend_time_column, ML_Tools.fingerprint(features))
+        result = ML_Tools.result_cache.get(key)
+        if result is None:
+            # Concurrent misses for the same key wait on a single fit
+            result = ML_Tools._inflight.do(key, ML_Tools._fit_and_cache, key, features,
+                                           target_column, trend_time_column)
+        return result
 
     @staticmethod
+    def _fit_and_cache(key, features, target_column, trend_time_column):
+        features_std = ML_Tools.standardize_features(features)
+        result = ML_Tools.run_linear_regression(
+            features_std,
+            target_column=target_column,
+            trend_df=features,
+            trend_time_column=trend_time_column,
+        )
+        ML_Tools.result_cache.put(key, result)
+        return result
+
+    @staticmethod
+    @timed('analyze_videos')
+    def analyze_videos(
+        videos_json,
+        target_column: str = 'viewCount',
+        trend_time_column: str = 'daysSinceOrigination',
+    ) -> dict:
+        """Features + standardization + regression for one channel's raw videos
+        (or a VideoColumns).
+
+        Returns the JSON-safe result (no 'model'), so it can run in a worker
+        process and be pickled back.
+        """
+        if isinstance(videos_json, VideoColumns):
+            features = videos_json.to_dataframe()
+        else:
+            features = Formatter.videos_to_dataframe(videos_json)
+        features_std = ML_Tools.standardize_features(features)
+        lr_result = ML_Tools.run_linear_regression(
+            features_std,
+            target_column=target_column,
+            trend_df=features,
+            trend_time_column=trend_time_column,
+        )
+        return {k: v for k, v in lr_result.items() if k != 'model'}
+
+    @staticmethod
+    @timed('incremental_regression')
+    def incremental_regression(
+        channel_id: str,
+        features: pd.DataFrame,
+        row_keys,
+        target_column: str = 'viewCount',
+        trend_time_column: str = 'daysSinceOrigination',
+        generation=None,
+    ) -> dict:
+        """Regression result for a channel, folding in only rows not seen before.
+
+        row_keys (e.g. videoIds) align with the rows of features. Existing rows
+        are assumed unchanged while `generation` (FeatureStore's
+        attrs['generation']) stays the same; the model is rebuilt when it
+        changes, when the feature columns change or when known rows disappear.
+        """
+        row_keys = list(row_keys)
+        key = (channel_id, target_column, trend_time_column)
+        with ML_Tools._incremental_lock:
+            entry = ML_Tools.incremental_models.get(key)
+            model = entry[1] if entry is not None and entry[0] == generation else None
+            if (
+                model is None
+                or model.columns != list(features.columns)
+                or not model.row_keys.issubset(row_keys)
+            ):
+                model = IncrementalRegression(features.columns, target_column, trend_time_column)
+                ML_Tools.incremental_models.put(key, (generation, model))
+            new_rows = [i for i, k in enumerate(row_keys) if k not in model.row_keys]
+            if new_rows:
+                model.partial_fit(features.iloc[new_rows], [row_keys[i] for i in new_rows])
+            return model.result()
+
+    @staticmethod
+    @timed('compute_trend_slope')
     def compute_trend_slope(
         df: pd.DataFrame,
         target_column: str,
@@ -449,6 +1732,7 @@ class ML_Tools:
         }
 
     @staticmethod
+    @timed('standardize_features')
     def standardize_features(df: pd.DataFrame) -> pd.DataFrame:
         # Assumes df is numeric-only (as returned by Formatter.videos_to_dataframe)
         if df.empty:
@@ -461,6 +1745,7 @@ class ML_Tools:
         return df_scaled
     
     @staticmethod
+    @timed('run_linear_regression')
     def run_linear_regression(
         df: pd.DataFrame,
         target_column: str,
@@ -528,6 +1813,137 @@ class ML_Tools:
 
         return result
     
+    # Regularization strengths tried for Ridge and Lasso by evaluate_models
+    EVAL_ALPHAS = (0.001, 0.01, 0.1, 1.0, 10.0, 100.0)
+
+    @staticmethod
+    @timed('evaluate_models')
+    def evaluate_models(
+        features: pd.DataFrame,
+        target_column: str = 'viewCount',
+        folds: int = 5,
+        alphas=EVAL_ALPHAS,
+        workers: int = 1,
+        executor=None,
+        seed: int = 42,
+    ) -> dict:
+        """k-fold cross-validation of OLS, Ridge and Lasso (over `alphas`).
+
+        The frame is standardized once, as in cached_regression, into a single
+        float64 matrix (target last). With more than one worker, or an
+        `executor` from evaluation_pool(), the matrix lives in shared memory
+        and each candidate estimator is scored on all folds by one task that
+        maps it read-only, so nothing but fold indices is copied per process.
+        Candidates come back best (lowest mean RMSE) first, each with the mean
+        and standard deviation of its held-out r2/mae/rmse over the folds.
+        """
+        if target_column not in features.columns:
+            raise ValueError(f"Target column '{target_column}' not found in DataFrame")
+        feature_columns = [c for c in features.columns if c != target_column]
+        if not feature_columns:
+            raise ValueError("No feature columns available after dropping target")
+        n = len(features)
+        # At least two held-out rows per fold, so r2 is defined
+        folds = min(folds, n // 2)
+        if folds < 2:
+            raise ValueError("Need at least 4 videos for cross-validation")
+
+        candidates = [('ols', None)]
+        candidates += [(name, float(a)) for name in ('ridge', 'lasso') for a in alphas]
+        shape = (n, len(feature_columns) + 1)
+        pool = executor
+        if pool is None and workers > 1:
+            pool = ML_Tools.evaluation_pool(workers)
+        shm = matrix = None
+        try:
+            if pool is None:
+                matrix = np.empty(shape)
+            else:
+                shm = shared_memory.SharedMemory(create=True, size=max(1, n * shape[1] * 8))
+                matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            matrix[:] = features[feature_columns + [target_column]].to_numpy(dtype=np.float64)
+            StandardScaler(copy=False).fit_transform(matrix)
+            if pool is None:
+                scores = [ML_Tools._cross_validate(matrix, folds, seed, name, alpha) for name, alpha in candidates]
+            else:
+                tasks = [pool.submit(ML_Tools._cross_validate_shared, shm.name, shape, folds, seed, name, alpha)
+                         for name, alpha in candidates]
+                scores = [t.result() for t in tasks]
+        finally:
+            if pool is not None and executor is None:
+                pool.shutdown()
+            if shm is not None:
+                matrix = None  # release the buffer export before closing
+                shm.close()
+                shm.unlink()
+
+        results = []
+        for (name, alpha), fold_scores in zip(candidates, scores):
+            metrics = {
+                metric: {'mean': float(np.mean(values)), 'std': float(np.std(values))}
+                for metric, values in fold_scores.items()
+            }
+            results.append({'estimator': name, 'alpha': alpha, 'metrics': metrics})
+        results.sort(key=lambda r: r['metrics']['rmse']['mean'])
+        return {
+            'target': target_column,
+            'n_samples': n,
+            'n_features': len(feature_columns),
+            'folds': folds,
+            'candidates': results,
+            'best': results[0],
+        }
+
+    @staticmethod
+    def evaluation_pool(workers: int) -> ProcessPoolExecutor:
+        """Process pool for evaluate_models, started like the analysis pool (see worker_context).
+
+        Starts the resource tracker first so workers share the parent's;
+        otherwise each worker gets its own, which unlinks the shared matrix
+        when that worker exits.
+        """
+        resource_tracker.ensure_running()
+        return ProcessPoolExecutor(max_workers=workers, mp_context=ML_Tools.worker_context())
+
+    @staticmethod
+    def _cross_validate_shared(shm_name: str, shape, folds: int, seed: int, name: str, alpha):
+        """_cross_validate on a matrix in shared memory (runs in a pool worker)."""
+        shm = shared_memory.SharedMemory(name=shm_name)
+        matrix = None
+        try:
+            matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            matrix.flags.writeable = False
+            return ML_Tools._cross_validate(matrix, folds, seed, name, alpha)
+        finally:
+            matrix = None
+            shm.close()
+
+    @staticmethod
+    def _cross_validate(matrix: np.ndarray, folds: int, seed: int, name: str, alpha) -> dict:
+        """Held-out {'r2', 'mae', 'rmse'} lists over KFold(folds) for one estimator."""
+        from sklearn.exceptions import ConvergenceWarning
+        from sklearn.linear_model import Lasso, LinearRegression, Ridge
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+        from sklearn.model_selection import KFold
+
+        X, y = matrix[:, :-1], matrix[:, -1]
+        scores = {'r2': [], 'mae': [], 'rmse': []}
+        for train, test in KFold(n_splits=folds, shuffle=True, random_state=seed).split(X):
+            if name == 'ridge':
+                model = Ridge(alpha=alpha)
+            elif name == 'lasso':
+                model = Lasso(alpha=alpha, max_iter=10000)
+            else:
+                model = LinearRegression()
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', ConvergenceWarning)
+                model.fit(X[train], y[train])
+            y_pred = model.predict(X[test])
+            scores['r2'].append(float(r2_score(y[test], y_pred)))
+            scores['mae'].append(float(mean_absolute_error(y[test], y_pred)))
+            scores['rmse'].append(float(mean_squared_error(y[test], y_pred) ** 0.5))
+        return scores
+
     @staticmethod
     def print_regression_summary(lr_result: dict):
         print("Linear Regression Summary:")